@@ -1,15 +1,22 @@
 """
 Application factory for MTI (Miami Telemetry Interface).
 """
+import os
 from flask import Flask
+from sqlalchemy.orm import joinedload
 from config import config
 from .extensions import db, login_manager, migrate, socketio
+from .json_provider import OrjsonProvider
+
+# Alembic scripts live at the project root, next to run.py
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
 
 
 def create_app(config_name='default'):
     """Create and configure the Flask application."""
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = OrjsonProvider(app)
     
     config_class = config[config_name]
     if hasattr(config_class, 'init_app'):
@@ -17,10 +24,7 @@ def create_app(config_name='default'):
 
     db.init_app(app)
     login_manager.init_app(app)
-    migrate.init_app(app, db)
-    
-    cors_origins = app.config.get('SOCKETIO_CORS_ALLOWED_ORIGINS', '*')
-    socketio.init_app(app, cors_allowed_origins=cors_origins, async_mode='threading')
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
 
     from .blueprints.auth import auth_bp
     from .blueprints.admin import admin_bp
@@ -36,15 +40,28 @@ def create_app(config_name='default'):
     app.register_blueprint(websocket_bp, url_prefix='/ws')
     app.register_blueprint(game_bp, url_prefix='/game')
 
+    # Initialized after the blueprints are imported so the @socketio.on
+    # handlers are queued and attached to every app's server, not only the first.
+    cors_origins = app.config.get('SOCKETIO_CORS_ALLOWED_ORIGINS', '*')
+    async_mode = app.config.get('SOCKETIO_ASYNC_MODE', 'threading')
+    message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    socketio.init_app(app, cors_allowed_origins=cors_origins, async_mode=async_mode,
+                      message_queue=message_queue)
+
     @app.route('/')
     def index():
         from flask import redirect, url_for
         return redirect(url_for('auth.login'))
 
-    from .models import User
+    from .models import User, Role
 
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(User, int(user_id))
+        # Load the role and its permissions with the user so the permission
+        # checks made while handling the request need no further queries.
+        return db.session.get(
+            User, int(user_id),
+            options=[joinedload(User.role).joinedload(Role.permissions)]
+        )
 
     return app
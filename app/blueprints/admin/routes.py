@@ -4,6 +4,7 @@ Admin routes for user management.
 from functools import wraps
 from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
+from sqlalchemy.orm import raiseload, selectinload
 from . import admin_bp
 from ...extensions import db
 from ...models import User, Role, RolePermission
@@ -27,8 +28,10 @@ def manager_required(f):
 @manager_required
 def users():
     """Display user management page."""
-    users = User.query.all()
+    # Roles are loaded first so each user.role resolves from the identity map;
+    # any relationship that would need its own query raises instead.
     roles = Role.query.all()
+    users = User.query.options(raiseload('*', sql_only=True)).all()
     return render_template('admin/create_user.html', users=users, roles=roles)
 
 
@@ -102,7 +105,7 @@ def reset_password(user_id):
 @manager_required
 def permissions():
     """Display permission management page."""
-    roles = Role.query.all()
+    roles = Role.query.options(selectinload(Role.permissions), raiseload('*')).all()
     return render_template('admin/permissions.html', roles=roles)
 
 
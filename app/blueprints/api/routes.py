@@ -1,25 +1,162 @@
 """
 API routes for data export and sensor data ingestion.
 """
-from io import BytesIO
+import csv
+import functools
+import hashlib
+import threading
+import time
+import warnings
+from io import BytesIO, StringIO
 from datetime import datetime, timezone, timedelta
-from flask import jsonify, request, send_file, abort
+from typing import Annotated
+import msgspec
+from flask import jsonify, request, send_file, abort, current_app
 from flask_login import login_required, current_user
-import pandas as pd
+from sqlalchemy import distinct, func, tuple_
 from . import api_bp
-from ...extensions import db
+from ...extensions import db, socketio
 from ...models import SensorData
 
 
+# Upper bound on rows returned by a single /sensor-data request
+MAX_SENSOR_DATA_LIMIT = 5000
+
+# Longest look-back window a client may ask for, in hours (30 days)
+MAX_QUERY_HOURS = 720
+
+# Export sheet layout. Widths are fixed because the write-only workbook
+# needs them before any rows are streamed in.
+EXPORT_COLUMNS = ('Timestamp', 'Sensor_ID', 'Value', 'Unit', 'Status')
+EXPORT_COLUMN_WIDTHS = (21, 24, 12, 10, 10)
+EXPORT_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Row striping and status colours are applied as sheet metadata (a table
+# style plus conditional formats on the Status column), not per cell.
+EXPORT_TABLE_STYLE_NAME = 'TableStyleMedium9'
+EXPORT_STATUS_COLORS = {
+    'WARNING': 'FFEB9C',
+    'ERROR': 'FFC7CE',
+}
+
+# Column names for the machine-readable export formats (match to_dict keys)
+EXPORT_FIELDS = ('timestamp', 'sensor_name', 'value', 'unit', 'status')
+
+EXPORT_MIMETYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/vnd.apache.arrow.file',
+}
+
+
+class SensorReading(msgspec.Struct):
+    """One reading accepted by /ingest."""
+    sensor_name: Annotated[str, msgspec.Meta(min_length=1)]
+    value: float
+    unit: str = ''
+    status: str = 'OK'
+
+
+# Ingest bodies are either a single reading or a list of them. Non-strict
+# mode keeps accepting numeric strings such as "3.5" for value.
+_ingest_decoder = msgspec.json.Decoder(list[SensorReading] | SensorReading, strict=False)
+
+
+def decode_ingest_payload(body):
+    """Decode an ingest body into reading dicts plus per-item errors."""
+    if not body:
+        return [], []
+    try:
+        # Fast path: validate the whole batch in a single C-level pass
+        readings = _ingest_decoder.decode(body)
+        errors = []
+    except msgspec.ValidationError:
+        # Slow path: keep the valid items and report the rejected ones
+        data = msgspec.json.decode(body)
+        if not data:
+            return [], []
+        items = data if isinstance(data, list) else [data]
+        readings, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                readings.append(msgspec.convert(item, SensorReading, strict=False))
+            except msgspec.ValidationError as e:
+                errors.append({'index': index, 'error': str(e)})
+
+    if isinstance(readings, SensorReading):
+        readings = [readings]
+    return msgspec.to_builtins(readings), errors
+
+
+# Short-lived cache for the dashboard polling endpoints, shared by every
+# client polling this worker. Cleared whenever new readings are ingested.
+# Entries are kept in insertion order so the oldest can be evicted first.
+POLL_CACHE_MAX_ENTRIES = 64
+_poll_cache = {}
+_poll_cache_lock = threading.Lock()
+
+
+def query_hours():
+    """Read the `hours` query argument, clamped to 1..MAX_QUERY_HOURS."""
+    hours = request.args.get('hours', 1, type=int)
+    return max(1, min(hours, MAX_QUERY_HOURS))
+
+
+def cached_json_response(key, build_payload):
+    """Serve a JSON payload from the poll cache, answering 304 on ETag match."""
+    ttl = current_app.config.get('SENSOR_CACHE_TTL', 0)
+    now = time.monotonic()
+
+    with _poll_cache_lock:
+        entry = _poll_cache.get(key)
+
+    if entry is None or entry[0] <= now:
+        body = current_app.json.dumps(build_payload()).encode('utf-8')
+        etag = hashlib.md5(body, usedforsecurity=False).hexdigest()
+        entry = (now + ttl, body, etag)
+        if ttl > 0:
+            with _poll_cache_lock:
+                _poll_cache.pop(key, None)
+                _poll_cache[key] = entry
+                if len(_poll_cache) > POLL_CACHE_MAX_ENTRIES:
+                    evict_poll_cache(now)
+
+    response = current_app.response_class(entry[1], mimetype='application/json')
+    response.set_etag(entry[2])
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def evict_poll_cache(now):
+    """Drop expired entries, then the oldest until the cache fits. Caller holds the lock."""
+    for key in [key for key, entry in _poll_cache.items() if entry[0] <= now]:
+        del _poll_cache[key]
+    while len(_poll_cache) > POLL_CACHE_MAX_ENTRIES:
+        del _poll_cache[next(iter(_poll_cache))]
+
+
+def invalidate_poll_cache():
+    """Drop cached polling responses so the next request sees fresh data."""
+    with _poll_cache_lock:
+        _poll_cache.clear()
+
+
 @api_bp.route('/sensor-data')
 @login_required
 def get_sensor_data():
-    """Get sensor data for charts, with optional filtering."""
+    """Get sensor data for charts, with optional filtering and keyset paging."""
     sensor_name = request.args.get('sensor_name')
-    hours = request.args.get('hours', 1, type=int)
+    hours = query_hours()
     limit = request.args.get('limit', 100, type=int)
+    limit = max(1, min(limit, MAX_SENSOR_DATA_LIMIT))
+    before_ts = request.args.get('before_ts')
+    before_id = request.args.get('before_id')
 
-    query = SensorData.query
+    query = db.session.query(
+        SensorData.id, SensorData.timestamp, SensorData.sensor_name,
+        SensorData.value, SensorData.unit, SensorData.status
+    )
 
     if sensor_name:
         query = query.filter(SensorData.sensor_name == sensor_name)
@@ -27,67 +164,225 @@ def get_sensor_data():
     since = datetime.now(timezone.utc) - timedelta(hours=hours)
     query = query.filter(SensorData.timestamp >= since)
 
-    data = query.order_by(SensorData.timestamp.desc()).limit(limit).all()
+    # Keyset paging: pass the oldest row's timestamp and id to get the page
+    # before it. The id breaks ties between rows sharing a timestamp.
+    if before_ts is not None or before_id is not None:
+        try:
+            cursor = (datetime.fromisoformat(before_ts), int(before_id))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'before_ts and before_id must be an ISO timestamp and an integer id'}), 400
+        query = query.filter(tuple_(SensorData.timestamp, SensorData.id) < cursor)
+
+    # Take the newest `limit` rows, then let the database return them oldest-first
+    newest = query.order_by(SensorData.timestamp.desc(), SensorData.id.desc())\
+        .limit(limit).subquery()
+    rows = db.session.query(newest).order_by(newest.c.timestamp, newest.c.id).all()
 
-    return jsonify([item.to_dict() for item in reversed(data)])
+    return jsonify([row._asdict() for row in rows])
 
 
 @api_bp.route('/sensor-data/latest')
 @login_required
 def get_latest_sensor_data():
     """Get the latest reading for each sensor."""
-    sensor_names = db.session.query(SensorData.sensor_name).distinct().all()
-    sensor_names = [name[0] for name in sensor_names]
+    return cached_json_response(('latest',), query_latest_sensor_data)
+
 
-    latest_data = []
-    for name in sensor_names:
-        latest = SensorData.query.filter_by(sensor_name=name)\
-            .order_by(SensorData.timestamp.desc()).first()
-        if latest:
-            latest_data.append(latest.to_dict())
+def query_latest_sensor_data():
+    """Query the newest reading for every sensor."""
+    # Rank each sensor's readings newest-first in one query instead of
+    # issuing a separate lookup per sensor.
+    ranked = db.session.query(
+        SensorData.id, SensorData.timestamp, SensorData.sensor_name,
+        SensorData.value, SensorData.unit, SensorData.status,
+        func.row_number().over(
+            partition_by=SensorData.sensor_name,
+            order_by=(SensorData.timestamp.desc(), SensorData.id.desc())
+        ).label('rn')
+    ).subquery()
 
-    return jsonify(latest_data)
+    rows = db.session.query(
+        ranked.c.id, ranked.c.timestamp, ranked.c.sensor_name,
+        ranked.c.value, ranked.c.unit, ranked.c.status
+    ).filter(ranked.c.rn == 1).order_by(ranked.c.sensor_name).all()
+
+    return [row._asdict() for row in rows]
 
 
 @api_bp.route('/sensor-data/stats')
 @login_required
 def get_sensor_stats():
     """Get statistics for dashboard KPIs."""
-    hours = request.args.get('hours', 1, type=int)
+    hours = query_hours()
+    return cached_json_response(('stats', hours), lambda: query_sensor_stats(hours))
+
+
+def query_sensor_stats(hours):
+    """Aggregate KPI statistics over the last `hours` hours."""
     since = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-    data = SensorData.query.filter(SensorData.timestamp >= since).all()
+    total_readings, sensor_count, avg_value = db.session.query(
+        func.count(),
+        func.count(distinct(SensorData.sensor_name)),
+        func.avg(SensorData.value)
+    ).filter(SensorData.timestamp >= since).one()
 
-    if not data:
-        return jsonify({
+    if not total_readings:
+        return {
             'total_readings': 0,
             'sensor_count': 0,
             'avg_value': 0,
             'status_summary': {}
-        })
+        }
+
+    status_counts = db.session.query(SensorData.status, func.count())\
+        .filter(SensorData.timestamp >= since)\
+        .group_by(SensorData.status).all()
+
+    return {
+        'total_readings': total_readings,
+        'sensor_count': sensor_count,
+        'avg_value': round(avg_value or 0, 2),
+        'status_summary': dict(status_counts)
+    }
+
+
+def export_rows(query, batch_size):
+    """Stream (timestamp, sensor_name, value, unit, status) rows for export."""
+    statement = query.with_entities(
+        SensorData.timestamp, SensorData.sensor_name,
+        SensorData.value, SensorData.unit, SensorData.status
+    ).statement
+    # Server-side cursor where the driver supports one (e.g. psycopg2), so
+    # only batch_size rows are held in memory at a time
+    return db.session.execute(
+        statement,
+        execution_options={'stream_results': True, 'yield_per': batch_size}
+    )
 
-    sensor_names = set(d.sensor_name for d in data)
-    status_counts = {}
-    for d in data:
-        status_counts[d.status] = status_counts.get(d.status, 0) + 1
 
-    values = [d.value for d in data]
-    avg_value = sum(values) / len(values) if values else 0
+def build_xlsx_export(query):
+    """Write the export query to an XLSX workbook."""
+    return write_xlsx(export_rows(query, 1000))
+
+
+def write_xlsx(rows):
+    """Write (timestamp, sensor_name, value, unit, status) rows to an XLSX workbook."""
+    # openpyxl is slow to import and only needed here, so the app and its
+    # CLI commands don't pay for it at startup
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.formatting.rule import CellIsRule
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Sensor Data')
+    for idx, width in enumerate(EXPORT_COLUMN_WIDTHS, start=1):
+        worksheet.column_dimensions[get_column_letter(idx)].width = width
+
+    header_font = Font(bold=True)
+    header = []
+    for title in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(worksheet, value=title)
+        cell.font = header_font
+        header.append(cell)
+    worksheet.append(header)
+
+    # Stream plain row tuples straight into the sheet; no ORM objects or
+    # per-row style objects are created.
+    last_row = 1
+    for timestamp, *values in rows:
+        worksheet.append([timestamp.strftime(EXPORT_TIMESTAMP_FORMAT), *values])
+        last_row += 1
+
+    # A table needs at least one data row below its header
+    if last_row > 1:
+        last_column = get_column_letter(len(EXPORT_COLUMNS))
+        table = Table(displayName='SensorData', ref=f'A1:{last_column}{last_row}')
+        table.tableStyleInfo = TableStyleInfo(name=EXPORT_TABLE_STYLE_NAME, showRowStripes=True)
+        # Write-only sheets can't read the header back, so name columns here
+        table.tableColumns = [
+            TableColumn(id=idx, name=title)
+            for idx, title in enumerate(EXPORT_COLUMNS, start=1)
+        ]
+        # openpyxl warns on every write-only add_table even when the columns
+        # are set, as they are above
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='In write-only mode you must add table columns manually')
+            worksheet.add_table(table)
+
+        status_range = f'{last_column}2:{last_column}{last_row}'
+        for status, color in EXPORT_STATUS_COLORS.items():
+            fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+            worksheet.conditional_formatting.add(
+                status_range,
+                CellIsRule(operator='equal', formula=[f'"{status}"'], fill=fill)
+            )
 
-    return jsonify({
-        'total_readings': len(data),
-        'sensor_count': len(sensor_names),
-        'avg_value': round(avg_value, 2),
-        'status_summary': status_counts
-    })
+    output = BytesIO()
+    workbook.save(output)
+    return output
+
+
+@functools.cache
+def empty_xlsx_bytes():
+    """Header-only workbook served when an export range matches no rows."""
+    return write_xlsx(()).getvalue()
+
+
+def build_csv_export(query):
+    """Write the export query to a CSV file."""
+    text = StringIO()
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_FIELDS)
+    for timestamp, *values in export_rows(query, 10000):
+        writer.writerow([timestamp.isoformat(), *values])
+
+    return BytesIO(text.getvalue().encode('utf-8'))
+
+
+def build_arrow_export(query, export_format):
+    """Write the export query to a Parquet or Feather file."""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError:
+        abort(501, description="Parquet/Feather export requires pyarrow.")
+
+    columns = {field: [] for field in EXPORT_FIELDS}
+    for batch in export_rows(query, 10000).partitions():
+        for field, values in zip(EXPORT_FIELDS, zip(*batch)):
+            columns[field].extend(values)
+
+    table = pa.Table.from_pydict(columns, schema=pa.schema([
+        ('timestamp', pa.timestamp('us')),
+        ('sensor_name', pa.string()),
+        ('value', pa.float64()),
+        ('unit', pa.string()),
+        ('status', pa.string()),
+    ]))
+
+    output = BytesIO()
+    if export_format == 'parquet':
+        pq.write_table(table, output, compression='zstd')
+    else:
+        feather.write_feather(table, output, compression='lz4')
+    return output
 
 
 @api_bp.route('/export')
 @login_required
 def export_xlsx():
-    """Export sensor data to XLSX file."""
+    """Export sensor data to XLSX (default), CSV, Parquet or Feather."""
     if not current_user.can_export():
         abort(403, description="You do not have permission to export data.")
+
+    export_format = request.args.get('format', 'xlsx').lower()
+    if export_format not in EXPORT_MIMETYPES:
+        abort(400, description=f"Unsupported export format: {export_format}")
     
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
@@ -108,82 +403,63 @@ def export_xlsx():
         except ValueError:
             pass
 
-    data = query.order_by(SensorData.timestamp.desc()).all()
+    query = query.order_by(SensorData.timestamp.desc())
 
-    if data:
-        df = pd.DataFrame([{
-            'Timestamp': d.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'Sensor_ID': d.sensor_name,
-            'Value': d.value,
-            'Unit': d.unit,
-            'Status': d.status
-        } for d in data])
+    if export_format == 'xlsx':
+        if db.session.query(query.exists()).scalar():
+            output = build_xlsx_export(query)
+        else:
+            output = BytesIO(empty_xlsx_bytes())
+    elif export_format == 'csv':
+        output = build_csv_export(query)
     else:
-        df = pd.DataFrame(columns=['Timestamp', 'Sensor_ID', 'Value', 'Unit', 'Status'])
-
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Sensor Data', index=False)
-        
-        worksheet = writer.sheets['Sensor Data']
-        for idx, col in enumerate(df.columns):
-            max_length = max(
-                df[col].astype(str).map(len).max() if len(df) > 0 else 0,
-                len(col)
-            ) + 2
-            worksheet.column_dimensions[chr(65 + idx)].width = max_length
-
+        output = build_arrow_export(query, export_format)
+    size = output.getbuffer().nbytes
     output.seek(0)
 
-    filename = f'sensor_data_{datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")}.xlsx'
+    filename = f'sensor_data_{datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")}.{export_format}'
 
-    return send_file(
+    response = send_file(
         output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        mimetype=EXPORT_MIMETYPES[export_format],
         as_attachment=True,
-        download_name=filename
+        download_name=filename,
+        conditional=True
     )
+    # send_file cannot size an in-memory buffer; without this the export
+    # goes out chunked and clients get no download progress.
+    response.content_length = size
+    return response
 
 
 @api_bp.route('/ingest', methods=['POST'])
 def ingest_sensor_data():
     """Ingest sensor data from external sources."""
-    data = request.get_json()
+    try:
+        rows, errors = decode_ingest_payload(request.get_data())
+    except msgspec.DecodeError:
+        return jsonify({'error': 'Invalid JSON'}), 400
 
-    if not data:
+    if not rows and not errors:
         return jsonify({'error': 'No data provided'}), 400
 
-    items = data if isinstance(data, list) else [data]
-
     created = []
-    for item in items:
-        sensor_name = item.get('sensor_name')
-        value = item.get('value')
-        unit = item.get('unit', '')
-        status = item.get('status', 'OK')
-
-        if not sensor_name or value is None:
-            continue
-
-        try:
-            value = float(value)
-        except (TypeError, ValueError):
-            continue
-
-        sensor_data = SensorData(
-            sensor_name=sensor_name,
-            value=value,
-            unit=unit,
-            status=status
-        )
-        db.session.add(sensor_data)
-        db.session.flush()
-        created.append(sensor_data.to_dict())
-
-    db.session.commit()
+    if rows:
+        # One multi-row INSERT; RETURNING supplies the generated columns
+        result = SensorData.bulk_insert(rows)
+        for row, (record_id, timestamp) in zip(rows, result):
+            created.append({
+                'id': record_id,
+                'timestamp': timestamp.isoformat(),
+                **row
+            })
+        db.session.commit()
+        invalidate_poll_cache()
+        # Push once per batch so dashboards refresh without polling
+        socketio.emit('sensor_update', {'created': len(created)}, room='dashboard')
 
     return jsonify({
         'created': len(created),
-        'data': created
+        'data': created,
+        'errors': errors
     }), 201
@@ -4,7 +4,9 @@ Authentication routes for login and logout.
 from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from . import auth_bp
+from ...extensions import db
 from ...models import User
+from ...models.user_models import check_dummy_password
 
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
@@ -19,10 +21,17 @@ def login():
 
         user = User.query.filter_by(username=username).first()
 
+        # Unknown users still pay for a hash check so timing can't enumerate them
+        if user is None:
+            check_dummy_password(password)
         if user is None or not user.check_password(password):
             flash('Invalid username or password', 'error')
             return redirect(url_for('auth.login'))
 
+        # Persist a password hash upgraded during check_password
+        if user in db.session.dirty:
+            db.session.commit()
+
         login_user(user)
         next_page = request.args.get('next')
         if not next_page or not next_page.startswith('/'):
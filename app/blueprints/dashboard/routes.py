@@ -4,21 +4,18 @@ Dashboard routes for the 4-panel grid view.
 from flask import render_template
 from flask_login import login_required, current_user
 from . import dashboard_bp
+from ...models.permission_models import PANEL_COUNT
 
 
 @dashboard_bp.route('/')
 @login_required
 def grid_view():
     """Display the main 4-panel dashboard grid."""
-    # Get user permissions
-    perms = current_user.get_permissions()
-    
     # Build permission context for template
+    panel_mask = current_user.panel_mask()
     panel_access = {
-        'panel_1': current_user.can_view_panel(1),
-        'panel_2': current_user.can_view_panel(2),
-        'panel_3': current_user.can_view_panel(3),
-        'panel_4': current_user.can_view_panel(4),
+        f'panel_{panel_num}': bool(panel_mask >> (panel_num - 1) & 1)
+        for panel_num in range(1, PANEL_COUNT + 1)
     }
     
     return render_template(
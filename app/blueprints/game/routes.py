@@ -2,13 +2,24 @@
 Game routes for itch.io embed proxy.
 Fetches itch.io content server-side and rewrites URLs to bypass embedding restrictions.
 """
-import re
+import hashlib
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin, urlparse, quote
 from flask import Response, abort, current_app, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_cache_control_header
 from flask_login import login_required
 from . import game_bp
 
+try:
+    # google-re2 guarantees linear-time matching on untrusted upstream HTML
+    import re2 as regex_engine
+except ImportError:
+    import re as regex_engine
+
 
 # Configure your itch.io game URL here
 ITCHIO_GAME_URL = "https://ae-alexander-elert.itch.io/miami-university-ohio"
@@ -18,6 +29,45 @@ ITCHIO_ASSET_BASE_URL = "https://v6p9d9t4.ssl.hwcdn.net"  # Common itch.io CDN
 # Request timeout in seconds
 REQUEST_TIMEOUT = 20
 
+# Seconds to wait before retrying a failed /embed fetch; meanwhile the last
+# good page (or the failure) is served from the cache
+EMBED_RETRY_AFTER = 10
+
+# Bytes read from upstream per chunk when streaming proxied assets
+ASSET_CHUNK_SIZE = 64 * 1024
+
+# Hosts (and their subdomains) /asset-proxy may fetch from
+ALLOWED_ASSET_HOSTS = frozenset({'itch.io', 'hwcdn.net', 'itch.zone'})
+
+# Upstream headers passed through unchanged with proxied assets
+FORWARDED_ASSET_HEADERS = ('Content-Length', 'Content-Encoding', 'ETag', 'Last-Modified')
+
+# URL-bearing constructs rewritten by rewrite_relative_urls, combined into
+# one alternation so the page is scanned once. Each arm is a named group
+# wrapping (prefix, url, suffix) groups. URL bodies use negated character
+# classes that cannot consume their own terminator, and there are no
+# lookaheads, so the pattern also compiles under RE2.
+_REWRITE_RE = regex_engine.compile(
+    r'(?P<src>(src=["\'])([^"\'\n]*)(["\']))'
+    r'|(?P<href>(href=["\'])([^"\'\n]*)(["\']))'
+    r'|(?P<url>(url\(["\']?)([^"\')\n]*)(["\']?\)))'
+    r'|(?P<srcset>(srcset=["\'])([^"\'\n]*)(["\']))'
+)
+# URLs each arm leaves untouched (absolute, inline data, or fragment links)
+_SKIP_PREFIXES = {
+    'src': ('http://', 'https://', 'data:', '//'),
+    'href': ('http://', 'https://', 'data:', '//', '#'),
+    'url': ('http://', 'https://', 'data:'),
+}
+# Literal prefixes of the arms above, used as a cheap presence probe
+_REWRITE_MARKERS = ('src=', 'href=', 'url(', 'srcset=')
+
+# Rewritten /embed page shared by all users until it expires. The lock makes
+# concurrent misses wait for a single upstream fetch. A failed fetch is
+# recorded in 'error' and not retried for EMBED_RETRY_AFTER seconds.
+_embed_cache = {'html': None, 'error': None, 'expires': 0.0}
+_embed_cache_lock = threading.Lock()
+
 
 def get_request_headers():
     """Get browser-like headers for requests."""
@@ -32,6 +82,21 @@ def get_request_headers():
     }
 
 
+def create_http_session():
+    """Create a pooled HTTP session so upstream connections are reused."""
+    session = requests.Session()
+    session.headers.update(get_request_headers())
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Shared by both proxy routes. Under the eventlet worker the sockets are
+# monkey-patched, so a slow upstream only parks its own green thread.
+_http = create_http_session()
+
+
 def rewrite_relative_urls(html_content, base_url):
     """
     Rewrite relative URLs in HTML to absolute URLs pointing to itch.io.
@@ -43,49 +108,42 @@ def rewrite_relative_urls(html_content, base_url):
     Returns:
         HTML string with rewritten URLs
     """
-    # Rewrite src attributes (images, scripts, iframes)
-    html_content = re.sub(
-        r'(src=["\'])(?!https?://|data:|//)(.*?)(["\'])',
-        lambda m: m.group(1) + urljoin(base_url, m.group(2)) + m.group(3),
-        html_content
-    )
-    
-    # Rewrite href attributes (stylesheets, links)
-    html_content = re.sub(
-        r'(href=["\'])(?!https?://|data:|//|#)(.*?)(["\'])',
-        lambda m: m.group(1) + urljoin(base_url, m.group(2)) + m.group(3),
-        html_content
-    )
-    
-    # Rewrite url() in inline styles
-    html_content = re.sub(
-        r'(url\(["\']?)(?!https?://|data:)(.*?)(["\']?\))',
-        lambda m: m.group(1) + urljoin(base_url, m.group(2)) + m.group(3),
-        html_content
-    )
-    
-    # Rewrite srcset attributes (responsive images)
-    def rewrite_srcset(match):
-        srcset_value = match.group(2)
-        # Split by comma, rewrite each URL, rejoin
-        entries = srcset_value.split(',')
+    if not any(marker in html_content for marker in _REWRITE_MARKERS):
+        return html_content
+
+    def rewrite(match):
+        # The arm's named group closes last, so lastindex points at it
+        prefix, value, suffix = match.group(
+            match.lastindex + 1, match.lastindex + 2, match.lastindex + 3
+        )
+        kind = match.lastgroup
+        if kind != 'srcset':
+            if value.startswith(_SKIP_PREFIXES[kind]):
+                return match.group(0)
+            return prefix + urljoin(base_url, value) + suffix
+
+        # srcset: split by comma, rewrite each URL, rejoin
         rewritten = []
-        for entry in entries:
+        for entry in value.split(','):
             parts = entry.strip().split()
             if parts:
                 url = parts[0]
                 if not url.startswith(('http://', 'https://', 'data:')):
                     parts[0] = urljoin(base_url, url)
                 rewritten.append(' '.join(parts))
-        return match.group(1) + ', '.join(rewritten) + match.group(3)
-    
-    html_content = re.sub(
-        r'(srcset=["\'])(.*?)(["\'])',
-        rewrite_srcset,
-        html_content
-    )
-    
-    return html_content
+        return prefix + ', '.join(rewritten) + suffix
+
+    return _REWRITE_RE.sub(rewrite, html_content)
+
+
+def is_allowed_asset_url(asset_url):
+    """Check the URL is http(s) on an allowed host or one of its subdomains."""
+    parsed = urlparse(asset_url)
+    if parsed.scheme not in ('http', 'https'):
+        return False
+    host = parsed.hostname or ''
+    return any(host == allowed or host.endswith('.' + allowed)
+               for allowed in ALLOWED_ASSET_HOSTS)
 
 
 def add_permissive_headers(response):
@@ -98,20 +156,15 @@ def add_permissive_headers(response):
     return response
 
 
-@game_bp.route('/embed')
-@login_required
-def proxy_game_embed():
+def fetch_game_embed(target_url):
     """
-    Proxy the configured itch.io game page with URL rewriting.
-    This fetches the game page and rewrites all URLs to be absolute.
-        
+    Fetch and rewrite the itch.io game page.
+    
     Returns:
-        The proxied HTML content with rewritten URLs
+        Tuple of (rewritten HTML, seconds it may be cached for)
     """
-    target_url = ITCHIO_GAME_URL
-    
     try:
-        resp = requests.get(target_url, headers=get_request_headers(), timeout=REQUEST_TIMEOUT)
+        resp = _http.get(target_url, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
         
     except requests.exceptions.Timeout:
@@ -121,9 +174,44 @@ def proxy_game_embed():
         current_app.logger.error(f"Error fetching itch.io game: {e}")
         abort(502, description="Unable to fetch game content")
     
-    # Get the content and rewrite URLs
-    html_content = resp.text
-    html_content = rewrite_relative_urls(html_content, target_url)
+    # Honor a shorter upstream max-age than our own TTL
+    ttl = current_app.config.get('GAME_EMBED_CACHE_TTL', 0)
+    max_age = parse_cache_control_header(resp.headers.get('Cache-Control')).max_age
+    if max_age is not None:
+        ttl = min(ttl, max_age)
+    
+    return rewrite_relative_urls(resp.text, target_url), ttl
+
+
+@game_bp.route('/embed')
+@login_required
+def proxy_game_embed():
+    """
+    Proxy the configured itch.io game page with URL rewriting.
+    The rewritten page is cached for GAME_EMBED_CACHE_TTL seconds. If a
+    refresh fails, the last good page (or the error) is served for
+    EMBED_RETRY_AFTER seconds, so requests queued behind a slow or failing
+    upstream don't each repeat the fetch.
+        
+    Returns:
+        The proxied HTML content with rewritten URLs
+    """
+    with _embed_cache_lock:
+        if time.monotonic() >= _embed_cache['expires']:
+            try:
+                html, ttl = fetch_game_embed(ITCHIO_GAME_URL)
+            except HTTPException as e:
+                _embed_cache['error'] = e
+                _embed_cache['expires'] = time.monotonic() + EMBED_RETRY_AFTER
+                if _embed_cache['html'] is not None:
+                    current_app.logger.warning("Serving stale itch.io game page")
+            else:
+                _embed_cache.update(html=html, error=None, expires=time.monotonic() + ttl)
+        html_content = _embed_cache['html']
+        error = _embed_cache['error']
+    
+    if html_content is None:
+        abort(error.code, description=error.description)
     
     # Create response with permissive headers
     response = Response(html_content, mimetype='text/html')
@@ -132,15 +220,9 @@ def proxy_game_embed():
     return response
 
 
-@game_bp.route('/frame')
-@login_required
-def game_frame():
-    """
-    Serve a minimal HTML page that embeds the itch.io game in a full-page iframe.
-    This acts as a wrapper that your dashboard can safely embed.
-    """
-    # This HTML page will be served from your domain, so it can be embedded
-    html = f'''<!DOCTYPE html>
+# Wrapper page served by /frame. It only depends on ITCHIO_GAME_URL, so it
+# is rendered once; served from our domain, it can be embedded anywhere.
+FRAME_HTML = f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -224,7 +306,7 @@ def game_frame():
                 </a>
             </div>
         </div>
-        <iframe 
+        <iframe
             id="game-iframe"
             src="{ITCHIO_GAME_URL}"
             allowfullscreen
@@ -267,11 +349,25 @@ def game_frame():
         }})();
     </script>
 </body>
-</html>'''
-    
-    response = Response(html, mimetype='text/html')
+</html>'''.encode('utf-8')
+FRAME_ETAG = hashlib.md5(FRAME_HTML, usedforsecurity=False).hexdigest()
+
+
+@game_bp.route('/frame')
+@login_required
+def game_frame():
+    """
+    Serve a minimal HTML page that embeds the itch.io game in a full-page iframe.
+    This acts as a wrapper that your dashboard can safely embed.
+    """
+    response = Response(FRAME_HTML, mimetype='text/html')
     response = add_permissive_headers(response)
-    return response
+    # The page never changes between deploys; let the browser keep it for an
+    # hour and revalidate with the precomputed ETag afterwards
+    response.set_etag(FRAME_ETAG)
+    response.cache_control.private = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 
 @game_bp.route('/asset-proxy')
@@ -289,12 +385,11 @@ def proxy_asset():
         abort(400, description="Missing 'url' parameter")
     
     # Security: Only allow proxying from known itch.io domains
-    allowed_domains = ['itch.io', 'hwcdn.net', 'itch.zone']
-    if not any(domain in asset_url for domain in allowed_domains):
+    if not is_allowed_asset_url(asset_url):
         abort(403, description="Asset URL not from allowed domain")
     
     try:
-        resp = requests.get(asset_url, headers=get_request_headers(), timeout=30, stream=True)
+        resp = _http.get(asset_url, timeout=30, stream=True)
         resp.raise_for_status()
         
     except requests.exceptions.RequestException as e:
@@ -304,7 +399,17 @@ def proxy_asset():
     # Determine content type from response
     content_type = resp.headers.get('Content-Type', 'application/octet-stream')
     
-    response = Response(resp.content, mimetype=content_type)
+    # Relay the still-encoded body chunk by chunk so the upstream
+    # Content-Length and Content-Encoding stay valid
+    response = Response(
+        resp.raw.stream(ASSET_CHUNK_SIZE, decode_content=False),
+        mimetype=content_type,
+        direct_passthrough=True
+    )
+    response.call_on_close(resp.close)
+    for header in FORWARDED_ASSET_HEADERS:
+        if header in resp.headers:
+            response.headers[header] = resp.headers[header]
     response = add_permissive_headers(response)
     
     # Cache static assets
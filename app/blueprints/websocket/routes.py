@@ -5,8 +5,8 @@ STRUCTURE:
 - Core handlers (connect, disconnect, rooms) - Keep these
 - Demo/test handlers - Remove when done testing (marked with DELETE WHEN DONE TESTING)
 """
+import threading
 import time
-from datetime import datetime
 from flask import render_template, Response, request
 from flask_login import login_required, current_user
 from flask_socketio import emit, join_room, leave_room
@@ -14,7 +14,41 @@ from . import websocket_bp
 from ...extensions import socketio
 
 
-connected_clients = {}
+# Number of open Socket.IO connections on this worker. Changes are
+# broadcast at most once per CLIENT_COUNT_INTERVAL seconds so reconnect
+# storms don't send every client one frame per connect/disconnect.
+CLIENT_COUNT_INTERVAL = 0.2
+_client_count = 0
+_client_count_dirty = False
+_client_count_task = None
+_client_count_lock = threading.Lock()
+
+# MJPEG stream settings for /video_feed
+FRAME_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+JPEG_QUALITY = 80
+
+
+def update_client_count(delta):
+    """Adjust the connection count and schedule a coalesced broadcast."""
+    global _client_count, _client_count_dirty, _client_count_task
+    with _client_count_lock:
+        _client_count += delta
+        _client_count_dirty = True
+        if _client_count_task is None:
+            _client_count_task = socketio.start_background_task(broadcast_client_count)
+
+
+def broadcast_client_count():
+    """Background loop emitting the latest client_count when it changed."""
+    global _client_count_dirty
+    while True:
+        socketio.sleep(CLIENT_COUNT_INTERVAL)
+        with _client_count_lock:
+            if not _client_count_dirty:
+                continue
+            _client_count_dirty = False
+            count = _client_count
+        socketio.emit('client_count', {'count': count})
 
 
 # =============================================================================
@@ -25,27 +59,22 @@ connected_clients = {}
 def handle_connect():
     """Handle client connection."""
     client_id = request.sid
-    connected_clients[client_id] = {
-        'sid': client_id,
-        'username': getattr(current_user, 'username', 'anonymous'),
-        'connected_at': time.time()
-    }
+    update_client_count(1)
+    # Every client gets the dashboard pushes (sensor_update, panel_data)
+    # without having to ask for them
+    join_room('dashboard')
     emit('connection_response', {
         'status': 'connected',
         'client_id': client_id,
         'message': 'Connected to MTI WebSocket server',
         'server_time': time.time() * 1000
     })
-    emit('client_count', {'count': len(connected_clients)}, broadcast=True)
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection."""
-    client_id = request.sid
-    if client_id in connected_clients:
-        del connected_clients[client_id]
-    emit('client_count', {'count': len(connected_clients)}, broadcast=True)
+    update_client_count(-1)
 
 
 @socketio.on('join_room')
@@ -73,7 +102,7 @@ def handle_panel_update(data):
     emit('panel_data', {
         'panel_id': panel_id,
         'data': panel_data,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': time.time() * 1000
     }, room='dashboard')
 
 
@@ -122,7 +151,7 @@ def handle_broadcast_message(data):
     emit('message_received', {
         'sender': sender,
         'message': message,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': time.time() * 1000
     }, broadcast=True)
 
 
@@ -135,26 +164,42 @@ def handle_send_number(data):
     emit('number_received', {
         'sender': sender,
         'value': value,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': time.time() * 1000
+    }, broadcast=True)
+
+
+@socketio.on('send_numbers')
+def handle_send_numbers(data):
+    """Send a batch of numbers to all clients in one frame. DELETE WHEN DONE TESTING."""
+    values = data.get('values', [])
+    sender = getattr(current_user, 'username', 'anonymous')
+    
+    emit('numbers_received', {
+        'sender': sender,
+        'values': values,
+        'timestamp': time.time() * 1000
     }, broadcast=True)
 
 
 @socketio.on('send_json')
 def handle_send_json(data):
     """Send JSON data to all clients. DELETE WHEN DONE TESTING."""
+    # Payloads may be pre-encoded JSON bytes, which are relayed untouched
     payload = data.get('payload', {})
     sender = getattr(current_user, 'username', 'anonymous')
     
     emit('json_received', {
         'sender': sender,
         'payload': payload,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': time.time() * 1000
     }, broadcast=True)
 
 
 @socketio.on('send_image')
 def handle_send_image(data):
-    """Send base64 image to all clients. DELETE WHEN DONE TESTING."""
+    """Send an image to all clients. DELETE WHEN DONE TESTING."""
+    # Binary images arrive as bytes and go back out as binary attachments;
+    # older clients still send base64 data URLs, which pass through as-is
     image_data = data.get('image', '')
     filename = data.get('filename', 'image')
     sender = getattr(current_user, 'username', 'anonymous')
@@ -162,8 +207,9 @@ def handle_send_image(data):
     emit('image_received', {
         'sender': sender,
         'image': image_data,
+        'mime': data.get('mime', 'image/jpeg'),
         'filename': filename,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': time.time() * 1000
     }, broadcast=True)
 
 
@@ -198,19 +244,26 @@ def generate_frames(camera_index=0):
     camera = cv2.VideoCapture(camera_index)
     if not camera.isOpened():
         camera = cv2.VideoCapture(0)
+    # Keep only the newest frame queued so we never encode a stale one
+    camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY,
+                     int(cv2.IMWRITE_JPEG_OPTIMIZE), 0]
     
     try:
+        frame = None
         while True:
-            success, frame = camera.read()
+            # Passing the previous frame back in lets OpenCV reuse its buffer
+            success, frame = camera.read(frame)
             if not success:
                 break
             
-            ret, buffer = cv2.imencode('.jpg', frame)
+            ret, buffer = cv2.imencode('.jpg', frame, encode_params)
             if not ret:
                 continue
-                
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+            
+            # Separate chunks avoid concatenating a copy of every frame
+            yield FRAME_PART_HEADER
+            yield buffer.tobytes()
+            yield b'\r\n'
     finally:
         camera.release()
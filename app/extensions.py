@@ -6,11 +6,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_socketio import SocketIO
+from .json_provider import OrjsonSocketIOJSON
 
 db = SQLAlchemy()
 login_manager = LoginManager()
 migrate = Migrate()
-socketio = SocketIO()
+socketio = SocketIO(json=OrjsonSocketIOJSON)
 
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Please log in to access this page.'
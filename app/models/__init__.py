@@ -3,6 +3,7 @@ Models package for MTI.
 """
 from .user_models import User, Role
 from .sensor_models import SensorData
-from .permission_models import RolePermission, DEFAULT_PERMISSIONS
+from .permission_models import RolePermission, DEFAULT_PERMISSIONS, DEFAULT_PERMISSION_MASKS
 
-__all__ = ['User', 'Role', 'SensorData', 'RolePermission', 'DEFAULT_PERMISSIONS']
+__all__ = ['User', 'Role', 'SensorData', 'RolePermission', 'DEFAULT_PERMISSIONS',
+           'DEFAULT_PERMISSION_MASKS']
@@ -1,98 +1,157 @@
 """
 Permission models for granular role-based access control.
 """
+from collections.abc import Mapping
+from sqlalchemy import event
 from ..extensions import db
 
 
+# Permission flag columns, in display order
+PERMISSION_FIELDS = (
+    'can_view_panel_1',
+    'can_view_panel_2',
+    'can_view_panel_3',
+    'can_view_panel_4',
+    'can_export_data',
+    'can_edit_data',
+    'can_manage_users',
+    'can_view_access_logs',
+)
+
+# One bit per permission flag, in PERMISSION_FIELDS order
+PERMISSION_BITS = {field: 1 << index for index, field in enumerate(PERMISSION_FIELDS)}
+VIEW_PANEL_1 = PERMISSION_BITS['can_view_panel_1']
+VIEW_PANEL_2 = PERMISSION_BITS['can_view_panel_2']
+VIEW_PANEL_3 = PERMISSION_BITS['can_view_panel_3']
+VIEW_PANEL_4 = PERMISSION_BITS['can_view_panel_4']
+EXPORT_DATA = PERMISSION_BITS['can_export_data']
+EDIT_DATA = PERMISSION_BITS['can_edit_data']
+MANAGE_USERS = PERMISSION_BITS['can_manage_users']
+VIEW_ACCESS_LOGS = PERMISSION_BITS['can_view_access_logs']
+
+# Panel flags occupy the low bits, so panel n is bit n - 1
+PANEL_COUNT = 4
+PANEL_MASK = VIEW_PANEL_1 | VIEW_PANEL_2 | VIEW_PANEL_3 | VIEW_PANEL_4
+
+# New roles can see the live feed and KPIs only
+DEFAULT_PERMISSION_MASK = VIEW_PANEL_1 | VIEW_PANEL_2
+
+
+def _flag_property(field, bit):
+    """Expose one bit of permissions_mask as a boolean attribute."""
+    def getter(self):
+        return bool(self.permissions_mask & bit)
+
+    def setter(self, value):
+        if value:
+            self.permissions_mask |= bit
+        else:
+            self.permissions_mask &= ~bit
+
+    return property(getter, setter, doc=f'{field} flag stored in permissions_mask')
+
+
 class RolePermission(db.Model):
-    """Stores permissions for each role."""
+    """Stores permissions for each role as a bitmask of PERMISSION_BITS."""
     __tablename__ = 'role_permissions'
     
     id = db.Column(db.Integer, primary_key=True)
     role_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=False, unique=True)
+    permissions_mask = db.Column(db.Integer, nullable=False, default=DEFAULT_PERMISSION_MASK)
     
     # Panel View Permissions
-    can_view_panel_1 = db.Column(db.Boolean, default=True)   # Live Sensor Feed
-    can_view_panel_2 = db.Column(db.Boolean, default=True)   # Current Status/KPIs
-    can_view_panel_3 = db.Column(db.Boolean, default=False)  # Historical Logs
-    can_view_panel_4 = db.Column(db.Boolean, default=False)  # Device Health
+    can_view_panel_1 = _flag_property('can_view_panel_1', VIEW_PANEL_1)   # Live Sensor Feed
+    can_view_panel_2 = _flag_property('can_view_panel_2', VIEW_PANEL_2)   # Current Status/KPIs
+    can_view_panel_3 = _flag_property('can_view_panel_3', VIEW_PANEL_3)   # Historical Logs
+    can_view_panel_4 = _flag_property('can_view_panel_4', VIEW_PANEL_4)   # Device Health
     
     # Action Permissions
-    can_export_data = db.Column(db.Boolean, default=False)   # Download .XLSX
-    can_edit_data = db.Column(db.Boolean, default=False)     # Write controls (future)
-    can_manage_users = db.Column(db.Boolean, default=False)  # Admin panel access
-    can_view_access_logs = db.Column(db.Boolean, default=False)  # View access logs
+    can_export_data = _flag_property('can_export_data', EXPORT_DATA)      # Download .XLSX
+    can_edit_data = _flag_property('can_edit_data', EDIT_DATA)            # Write controls (future)
+    can_manage_users = _flag_property('can_manage_users', MANAGE_USERS)   # Admin panel access
+    can_view_access_logs = _flag_property('can_view_access_logs', VIEW_ACCESS_LOGS)  # View access logs
     
     # Relationship
-    role = db.relationship('Role', backref=db.backref('permissions', uselist=False))
+    role = db.relationship('Role', back_populates='permissions')
+
+    def __init__(self, **kwargs):
+        # Seed the mask first so flag keyword arguments adjust the defaults
+        self.permissions_mask = kwargs.pop('permissions_mask', DEFAULT_PERMISSION_MASK)
+        super().__init__(**kwargs)
 
     def __repr__(self):
         return f'<RolePermission for Role {self.role_id}>'
 
+    def has(self, required):
+        """Check that every bit in the required mask is granted."""
+        return self.permissions_mask & required == required
+
     def to_dict(self):
-        """Convert to dictionary for easy access."""
-        return {
-            'can_view_panel_1': self.can_view_panel_1,
-            'can_view_panel_2': self.can_view_panel_2,
-            'can_view_panel_3': self.can_view_panel_3,
-            'can_view_panel_4': self.can_view_panel_4,
-            'can_export_data': self.can_export_data,
-            'can_edit_data': self.can_edit_data,
-            'can_manage_users': self.can_manage_users,
-            'can_view_access_logs': self.can_view_access_logs,
-        }
-
-
-# Default permissions for each role (most restrictive to least)
-DEFAULT_PERMISSIONS = {
-    'Investor': {
-        'can_view_panel_1': True,   # Live feed only
-        'can_view_panel_2': True,   # KPIs
-        'can_view_panel_3': False,
-        'can_view_panel_4': False,
-        'can_export_data': False,
-        'can_edit_data': False,
-        'can_manage_users': False,
-        'can_view_access_logs': False,
-    },
-    'Audit': {
-        'can_view_panel_1': True,
-        'can_view_panel_2': True,
-        'can_view_panel_3': True,   # Can see logs
-        'can_view_panel_4': False,
-        'can_export_data': True,    # Can export for auditing
-        'can_edit_data': False,
-        'can_manage_users': False,
-        'can_view_access_logs': True,  # Can see access logs
-    },
-    'Operator': {
-        'can_view_panel_1': True,
-        'can_view_panel_2': True,
-        'can_view_panel_3': True,
-        'can_view_panel_4': True,
-        'can_export_data': False,
-        'can_edit_data': False,
-        'can_manage_users': False,
-        'can_view_access_logs': False,
-    },
-    'Engineer': {
-        'can_view_panel_1': True,
-        'can_view_panel_2': True,
-        'can_view_panel_3': True,
-        'can_view_panel_4': True,
-        'can_export_data': True,
-        'can_edit_data': True,      # Can modify data
-        'can_manage_users': False,
-        'can_view_access_logs': False,
-    },
-    'Manager': {
-        'can_view_panel_1': True,
-        'can_view_panel_2': True,
-        'can_view_panel_3': True,
-        'can_view_panel_4': True,
-        'can_export_data': True,
-        'can_edit_data': True,
-        'can_manage_users': True,   # Full admin access
-        'can_view_access_logs': True,
-    },
+        """
+        Convert to dictionary for easy access.
+        
+        The dict is built once and reused until the mask changes or the
+        instance is expired/refreshed; treat it as read-only.
+        """
+        cached = self.__dict__.get('_dict_cache')
+        if cached is None:
+            mask = self.permissions_mask
+            cached = self._dict_cache = {
+                field: bool(mask & bit) for field, bit in PERMISSION_BITS.items()
+            }
+        return cached
+
+
+def _clear_dict_cache(target, *args):
+    """Drop the cached to_dict() result when permission values may change."""
+    # Expiry on commit can fire for instances that were already collected
+    if target is not None:
+        target.__dict__.pop('_dict_cache', None)
+
+
+event.listen(RolePermission.permissions_mask, 'set', _clear_dict_cache)
+event.listen(RolePermission, 'expire', _clear_dict_cache)
+event.listen(RolePermission, 'refresh', _clear_dict_cache)
+
+
+# Default permission masks for each role (most restrictive to least)
+DEFAULT_PERMISSION_MASKS = {
+    'Investor': VIEW_PANEL_1 | VIEW_PANEL_2,   # Live feed and KPIs only
+    'Audit': (VIEW_PANEL_1 | VIEW_PANEL_2 | VIEW_PANEL_3    # Can see logs
+              | EXPORT_DATA                                # Can export for auditing
+              | VIEW_ACCESS_LOGS),                         # Can see access logs
+    'Operator': VIEW_PANEL_1 | VIEW_PANEL_2 | VIEW_PANEL_3 | VIEW_PANEL_4,
+    'Engineer': (VIEW_PANEL_1 | VIEW_PANEL_2 | VIEW_PANEL_3 | VIEW_PANEL_4
+                 | EXPORT_DATA | EDIT_DATA),               # Can modify data
+    'Manager': sum(PERMISSION_BITS.values()),              # Full admin access
 }
+
+
+def default_mask_for(role_name):
+    """Get the default permission mask for a role (0 for unknown roles)."""
+    return DEFAULT_PERMISSION_MASKS.get(role_name, 0)
+
+
+def default_permissions_for(role_name):
+    """Expand a role's default mask into a {flag: bool} dict."""
+    mask = default_mask_for(role_name)
+    return {field: bool(mask & bit) for field, bit in PERMISSION_BITS.items()}
+
+
+class _DefaultPermissionsView(Mapping):
+    """Read-only {role: {flag: bool}} view expanded from the default masks."""
+
+    def __getitem__(self, role_name):
+        if role_name not in DEFAULT_PERMISSION_MASKS:
+            raise KeyError(role_name)
+        return default_permissions_for(role_name)
+
+    def __iter__(self):
+        return iter(DEFAULT_PERMISSION_MASKS)
+
+    def __len__(self):
+        return len(DEFAULT_PERMISSION_MASKS)
+
+
+# Per-flag view of DEFAULT_PERMISSION_MASKS, kept for existing callers
+DEFAULT_PERMISSIONS = _DefaultPermissionsView()
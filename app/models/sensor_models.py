@@ -2,16 +2,25 @@
 Sensor data models for telemetry storage.
 """
 from datetime import datetime, timezone
+from sqlalchemy import insert
 from ..extensions import db
 
 
 class SensorData(db.Model):
     """Sensor telemetry data model."""
     __tablename__ = 'sensor_data'
+    __table_args__ = (
+        # Serves per-sensor "newest first" lookups and sensor_name filters
+        db.Index('ix_sensor_data_sensor_timestamp', 'sensor_name', 'timestamp'),
+        # Covers the stats query (window filter, sensor count, average value
+        # and status histogram), so it never has to read the table rows
+        db.Index('ix_sensor_data_timestamp_sensor_status_value',
+                 'timestamp', 'sensor_name', 'status', 'value'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True, nullable=False)
-    sensor_name = db.Column(db.String(64), nullable=False, index=True)
+    timestamp = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    sensor_name = db.Column(db.String(64), nullable=False)
     value = db.Column(db.Float, nullable=False)
     unit = db.Column(db.String(20), nullable=False)
     status = db.Column(db.String(20), default='OK')
@@ -19,6 +28,22 @@ class SensorData(db.Model):
     def __repr__(self):
         return f'<SensorData {self.sensor_name}: {self.value}{self.unit}>'
 
+    @classmethod
+    def bulk_insert(cls, rows):
+        """
+        Insert many readings with a single executemany INSERT.
+        
+        Args:
+            rows: List of dicts with sensor_name, value, unit and status
+            
+        Returns:
+            Result of (id, timestamp) rows in the same order as rows
+        """
+        return db.session.execute(
+            insert(cls).returning(cls.id, cls.timestamp, sort_by_parameter_order=True),
+            rows
+        )
+
     def to_dict(self):
         """Convert sensor data to dictionary for JSON serialization."""
         return {
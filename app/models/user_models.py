@@ -1,9 +1,50 @@
 """
 User and Role models for authentication and authorization.
 """
-from werkzeug.security import generate_password_hash, check_password_hash
+import functools
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
 from flask_login import UserMixin
+from sqlalchemy import event
 from ..extensions import db
+from .permission_models import PANEL_COUNT, PANEL_MASK
+
+
+# Argon2id tuned to keep a login verification well under ~200 ms
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
+
+def hash_passwords(passwords):
+    """
+    Hash many passwords with Argon2id, spread across CPU cores.
+    
+    argon2-cffi releases the GIL while hashing, so threads are enough.
+    """
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(password_hasher.hash, passwords))
+
+
+@functools.cache
+def _dummy_password_hash():
+    """Argon2 hash of a random secret, built on first use."""
+    return password_hasher.hash(secrets.token_urlsafe(16))
+
+
+def check_dummy_password(password):
+    """
+    Spend the same time as a real password check and fail.
+    
+    Used for unknown usernames so login timing doesn't reveal which
+    accounts exist.
+    """
+    try:
+        password_hasher.verify(_dummy_password_hash(), password or '')
+    except (VerificationError, InvalidHashError):
+        pass
+    return False
 
 
 class Role(db.Model):
@@ -13,7 +54,8 @@ class Role(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), unique=True, nullable=False)
     
-    users = db.relationship('User', backref='role', lazy='dynamic')
+    users = db.relationship('User', back_populates='role', lazy='dynamic')
+    permissions = db.relationship('RolePermission', back_populates='role', uselist=False)
 
     def __repr__(self):
         return f'<Role {self.name}>'
@@ -32,30 +74,62 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(128))
     role_id = db.Column(db.Integer, db.ForeignKey('roles.id'))
 
+    role = db.relationship('Role', back_populates='users')
+
     def set_password(self, password):
-        """Hash and set the user's password."""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set the user's password with Argon2id."""
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        """Check the provided password against the stored hash."""
-        return check_password_hash(self.password_hash, password)
+        """
+        Check the provided password against the stored hash.
+        
+        Legacy Werkzeug hashes and Argon2 hashes with outdated parameters are
+        upgraded in place on success; the caller commits the change.
+        """
+        if not self.password_hash:
+            return False
+
+        if not self.password_hash.startswith('$argon2'):
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+
+        try:
+            password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
 
     def has_role(self, role_name):
         """Check if user has a specific role."""
         return self.role and self.role.name == role_name
 
     def get_permissions(self):
-        """Get the user's permissions based on their role."""
-        if self.role and self.role.permissions:
-            return self.role.permissions
-        return None
+        """
+        Get the user's permissions based on their role.
+        
+        Memoized on the instance so the can_* checks made while rendering a
+        page share one relationship traversal.
+        """
+        if '_permissions' not in self.__dict__:
+            role = self.role
+            self.__dict__['_permissions'] = role.permissions if role else None
+        return self.__dict__['_permissions']
+
+    def panel_mask(self):
+        """Get the user's panel permissions as a bitmask (bit n - 1 for panel n)."""
+        perms = self.get_permissions()
+        return perms.permissions_mask & PANEL_MASK if perms else 0
 
     def can_view_panel(self, panel_num):
         """Check if user can view a specific panel (1-4)."""
-        perms = self.get_permissions()
-        if not perms:
+        if not 1 <= panel_num <= PANEL_COUNT:
             return False
-        return getattr(perms, f'can_view_panel_{panel_num}', False)
+        return bool(self.panel_mask() >> (panel_num - 1) & 1)
 
     def can_export(self):
         """Check if user can export data."""
@@ -79,3 +153,15 @@ class User(UserMixin, db.Model):
 
     def __repr__(self):
         return f'<User {self.username}>'
+
+
+def _clear_permissions_cache(target, *args):
+    """Forget memoized permissions when the user's role may have changed."""
+    if target is not None:
+        target.__dict__.pop('_permissions', None)
+
+
+event.listen(User.role, 'set', _clear_permissions_cache)
+event.listen(User.role_id, 'set', _clear_permissions_cache)
+event.listen(User, 'expire', _clear_permissions_cache)
+event.listen(User, 'refresh', _clear_permissions_cache)
@@ -28,8 +28,18 @@ let isCameraActive = false;
 // WebSocket connection
 let socket = null;
 
-// Update interval (milliseconds)
-const UPDATE_INTERVAL = 50;
+// Backstop refresh interval (milliseconds). Ingested readings are pushed over
+// the WebSocket; polling only catches writers that bypass /api/ingest.
+const UPDATE_INTERVAL = 2000;
+let refreshPending = false;
+
+// Writers that don't push (e.g. the mock stream without REDIS_URL) would
+// leave the live chart up to UPDATE_INTERVAL behind, so it is polled fast
+// until a sensor_update has arrived within PUSH_TIMEOUT
+const LIVE_POLL_INTERVAL = 250;
+const PUSH_TIMEOUT = 5000;
+let lastPushAt = -Infinity;
+let livePollInFlight = false;
 
 /**
  * Initialize the dashboard on page load
@@ -43,6 +53,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Start auto-refresh
     setInterval(loadAllData, UPDATE_INTERVAL);
+    setInterval(pollLiveData, LIVE_POLL_INTERVAL);
     
     // Handle ESC key for fullscreen exit
     document.addEventListener('keydown', function(e) {
@@ -61,7 +72,11 @@ function initializeWebSocket() {
         
         socket.on('connect', function() {
             console.log('WebSocket connected');
-            socket.emit('join_dashboard', { room: 'dashboard' });
+        });
+        
+        socket.on('sensor_update', function() {
+            lastPushAt = performance.now();
+            scheduleRefresh();
         });
         
         socket.on('panel_data', function(data) {
@@ -74,6 +89,31 @@ function initializeWebSocket() {
     }
 }
 
+/**
+ * Coalesce bursts of pushed updates into one reload per animation frame
+ */
+function scheduleRefresh() {
+    if (refreshPending) return;
+    refreshPending = true;
+    requestAnimationFrame(function() {
+        refreshPending = false;
+        loadAllData();
+    });
+}
+
+/**
+ * Poll the live chart while no sensor_update pushes are arriving
+ */
+async function pollLiveData() {
+    if (livePollInFlight || performance.now() - lastPushAt < PUSH_TIMEOUT) return;
+    livePollInFlight = true;
+    try {
+        await loadSensorData();
+    } finally {
+        livePollInFlight = false;
+    }
+}
+
 /**
  * Handle real-time panel updates from WebSocket
  */
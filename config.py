@@ -3,12 +3,23 @@ Configuration settings for the MTI (Miami Telemetry Interface) application.
 """
 import os
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 
 # Load environment variables from a .env file if present. This ensures
 # scripts that directly import the app (not just run.py) pick up values.
 load_dotenv()
 
 basedir = os.path.abspath(os.path.dirname(__file__))
+_DEFAULT_SQLITE_URI = 'sqlite:///' + os.path.join(basedir, 'db.sqlite3')
+
+
+def parse_cors_origins(origins_str):
+    """Parse CORS origins from environment variable."""
+    if not origins_str or origins_str == '*':
+        return '*'
+    # Engine.IO checks each handshake's Origin with `in`, so a set keeps
+    # that lookup constant-time however long the allow-list grows.
+    return frozenset(origin.strip() for origin in origins_str.split(',') if origin.strip())
 
 
 class Config:
@@ -26,21 +37,47 @@ class Config:
         if len(app.config['SECRET_KEY']) < 16:
             raise ValueError("SECRET_KEY is too short. Use at least 16 characters.")
     
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
-        'sqlite:///' + os.path.join(basedir, 'db.sqlite3')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or _DEFAULT_SQLITE_URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    parse_cors_origins = staticmethod(parse_cors_origins)
+    
     @staticmethod
-    def parse_cors_origins(origins_str):
-        """Parse CORS origins from environment variable."""
-        if not origins_str or origins_str == '*':
-            return '*'
-        return [origin.strip() for origin in origins_str.split(',') if origin.strip()]
+    def engine_options(database_uri):
+        """Build connection pool settings for a server-backed database."""
+        # SQLite connections are local files; its default pool is already right
+        if database_uri.startswith('sqlite'):
+            return {}
+        # Sized for the dashboard's bursts of parallel panel requests; the
+        # database is local and stable, so skip the per-checkout ping.
+        options = {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 40)),
+            'pool_recycle': 1800,
+            'pool_pre_ping': False,
+        }
+        # psycopg2 batches executemany UPDATEs/DELETEs as well as INSERTs
+        if make_url(database_uri).get_driver_name() == 'psycopg2':
+            options['executemany_mode'] = 'values_plus_batch'
+        return options
     
-    SOCKETIO_CORS_ALLOWED_ORIGINS = parse_cors_origins.__func__(
+    SOCKETIO_CORS_ALLOWED_ORIGINS = parse_cors_origins(
         os.environ.get('SOCKETIO_CORS_ORIGINS', '*')
     )
 
+    # Must match the server running the app: 'threading' for the Werkzeug
+    # dev server, 'eventlet' for gunicorn's eventlet worker.
+    SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+
+    # Redis URL shared by all workers so broadcasts reach every client
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('REDIS_URL')
+
+    # Seconds to reuse /api/sensor-data/latest and /stats responses (0 disables)
+    SENSOR_CACHE_TTL = float(os.environ.get('SENSOR_CACHE_TTL', 2))
+
+    # Seconds to reuse the rewritten itch.io page served by /game/embed
+    GAME_EMBED_CACHE_TTL = float(os.environ.get('GAME_EMBED_CACHE_TTL', 60))
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -50,12 +87,13 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
-    SOCKETIO_CORS_ALLOWED_ORIGINS = Config.parse_cors_origins(
+    SOCKETIO_CORS_ALLOWED_ORIGINS = parse_cors_origins(
         os.environ.get(
-            'SOCKETIO_CORS_ORIGINS', 
+            'SOCKETIO_CORS_ORIGINS',
             'https://mti.wnusair.org,https://www.mti.wnusair.org'
         )
     )
+    SQLALCHEMY_ENGINE_OPTIONS = Config.engine_options(Config.SQLALCHEMY_DATABASE_URI)
 
 
 class TestingConfig(Config):
@@ -63,6 +101,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    SENSOR_CACHE_TTL = 0
+    GAME_EMBED_CACHE_TTL = 0
 
 
 config = {
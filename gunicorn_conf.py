@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for running MTI in production.
+
+Usage:
+    gunicorn -c gunicorn_conf.py run:app
+
+The eventlet worker keeps client connections alive and serves Socket.IO
+WebSocket traffic. Set SOCKETIO_ASYNC_MODE=eventlet so Flask-SocketIO
+matches the worker.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:5000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'eventlet')
+
+# Flask-SocketIO needs sticky sessions (or a message queue) to run more than
+# one worker, so default to a single worker for the async worker classes.
+if worker_class == 'sync':
+    default_workers = multiprocessing.cpu_count() * 2 + 1
+else:
+    default_workers = 1
+workers = int(os.environ.get('GUNICORN_WORKERS', default_workers))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Hold idle connections open between dashboard polls (nginx upstream keepalive)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 75))
+timeout = 60
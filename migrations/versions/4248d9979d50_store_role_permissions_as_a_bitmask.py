@@ -0,0 +1,69 @@
+"""store role permissions as a bitmask
+
+Replaces the eight boolean permission columns with one permissions_mask
+integer, backfilled from the existing flags (NULL counts as not granted).
+
+Revision ID: 4248d9979d50
+Revises: c4fe9ec86823
+Create Date: 2026-10-15 23:52:46.887242
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4248d9979d50'
+down_revision = 'c4fe9ec86823'
+branch_labels = None
+depends_on = None
+
+
+# Flag columns in bit order, as in app.models.permission_models at the time
+# of this revision; copied so later model changes can't alter the migration
+PERMISSION_FIELDS = (
+    'can_view_panel_1',
+    'can_view_panel_2',
+    'can_view_panel_3',
+    'can_view_panel_4',
+    'can_export_data',
+    'can_edit_data',
+    'can_manage_users',
+    'can_view_access_logs',
+)
+
+role_permissions = sa.table(
+    'role_permissions',
+    sa.column('permissions_mask', sa.Integer),
+    *(sa.column(field, sa.Boolean) for field in PERMISSION_FIELDS),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('role_permissions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('permissions_mask', sa.Integer(), nullable=True))
+
+    mask = sum(
+        sa.case((role_permissions.c[field].is_(True), 1 << bit), else_=0)
+        for bit, field in enumerate(PERMISSION_FIELDS)
+    )
+    op.execute(role_permissions.update().values(permissions_mask=mask))
+
+    with op.batch_alter_table('role_permissions', schema=None) as batch_op:
+        batch_op.alter_column('permissions_mask', existing_type=sa.Integer(), nullable=False)
+        for field in PERMISSION_FIELDS:
+            batch_op.drop_column(field)
+
+
+def downgrade():
+    with op.batch_alter_table('role_permissions', schema=None) as batch_op:
+        for field in PERMISSION_FIELDS:
+            batch_op.add_column(sa.Column(field, sa.Boolean(), nullable=True))
+
+    op.execute(role_permissions.update().values({
+        field: role_permissions.c.permissions_mask.op('&')(1 << bit) != 0
+        for bit, field in enumerate(PERMISSION_FIELDS)
+    }))
+
+    with op.batch_alter_table('role_permissions', schema=None) as batch_op:
+        batch_op.drop_column('permissions_mask')
@@ -0,0 +1,51 @@
+"""index sensor_data for dashboard queries
+
+Replaces the single-column sensor_name and timestamp indexes with the
+composite ones the dashboard queries use, and makes timestamp timezone
+aware. Stored values were written as UTC, so PostgreSQL converts them
+from UTC; SQLite has no such type and keeps the column as it is.
+
+Revision ID: f5896a5ec605
+Revises: 4248d9979d50
+Create Date: 2026-10-16 00:01:43.060954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5896a5ec605'
+down_revision = '4248d9979d50'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('sensor_data', schema=None) as batch_op:
+        batch_op.drop_index('ix_sensor_data_sensor_name')
+        batch_op.drop_index('ix_sensor_data_timestamp')
+        batch_op.create_index('ix_sensor_data_sensor_timestamp',
+                              ['sensor_name', 'timestamp'], unique=False)
+        batch_op.create_index('ix_sensor_data_timestamp_sensor_status_value',
+                              ['timestamp', 'sensor_name', 'status', 'value'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('sensor_data', 'timestamp',
+                        existing_type=sa.DateTime(),
+                        type_=sa.DateTime(timezone=True),
+                        postgresql_using="timestamp AT TIME ZONE 'UTC'")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('sensor_data', 'timestamp',
+                        existing_type=sa.DateTime(timezone=True),
+                        type_=sa.DateTime(),
+                        postgresql_using="timestamp AT TIME ZONE 'UTC'")
+
+    with op.batch_alter_table('sensor_data', schema=None) as batch_op:
+        batch_op.drop_index('ix_sensor_data_timestamp_sensor_status_value')
+        batch_op.drop_index('ix_sensor_data_sensor_timestamp')
+        batch_op.create_index('ix_sensor_data_timestamp', ['timestamp'], unique=False)
+        batch_op.create_index('ix_sensor_data_sensor_name', ['sensor_name'], unique=False)
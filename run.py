@@ -3,6 +3,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# eventlet has to patch the standard library before anything else imports it
+if os.environ.get('SOCKETIO_ASYNC_MODE') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
 from app import create_app, db
 from app.models import User, Role, SensorData, RolePermission
 
@@ -19,11 +24,10 @@ def make_shell_context():
 def seed_roles():
     """Seed the database with default roles."""
     roles = ['Manager', 'Engineer', 'Operator', 'Investor', 'Audit']
+    existing = {name for (name,) in db.session.query(Role.name).filter(Role.name.in_(roles))}
     for role_name in roles:
-        role = Role.query.filter_by(name=role_name).first()
-        if role is None:
-            role = Role(name=role_name)
-            db.session.add(role)
+        if role_name not in existing:
+            db.session.add(Role(name=role_name))
             print(f'Added role: {role_name}')
         else:
             print(f'Role already exists: {role_name}')
@@ -37,17 +41,16 @@ def seed_admin():
     import secrets
     import string
     
-    manager_role = Role.query.filter_by(name='Manager').first()
-    if manager_role is None:
+    manager_role_id = db.session.query(Role.id).filter_by(name='Manager').scalar()
+    if manager_role_id is None:
         print('Error: Manager role not found. Run seed_roles first.')
         return
     
-    admin = User.query.filter_by(username='admin').first()
-    if admin is None:
+    if db.session.query(User.id).filter_by(username='admin').scalar() is None:
         alphabet = string.ascii_letters + string.digits + string.punctuation
         secure_password = ''.join(secrets.choice(alphabet) for _ in range(16))
         
-        admin = User(username='admin', role_id=manager_role.id)
+        admin = User(username='admin', role_id=manager_role_id)
         admin.set_password(secure_password)
         db.session.add(admin)
         db.session.commit()
@@ -12,8 +12,10 @@ Usage:
 import os
 import sys
 import time
-import random
-from datetime import datetime
+from datetime import datetime, timezone
+import numpy as np
+from flask_socketio import SocketIO
+from sqlalchemy import event
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -21,41 +23,91 @@ from app import create_app, db
 from app.models import SensorData
 
 
-SENSORS = [
-    {'name': 'Arm_Servo_1', 'unit': 'deg', 'min': 0, 'max': 180},
-    {'name': 'Arm_Servo_2', 'unit': 'deg', 'min': 0, 'max': 180},
-    {'name': 'Motor_Temp', 'unit': 'C', 'min': 20, 'max': 85},
-    {'name': 'Motor_RPM', 'unit': 'RPM', 'min': 0, 'max': 5000},
-    {'name': 'Battery_Voltage', 'unit': 'V', 'min': 10, 'max': 14},
-    {'name': 'System_Load', 'unit': '%', 'min': 0, 'max': 100},
-]
+# (name, unit, min, max) for each simulated sensor
+SENSORS = (
+    ('Arm_Servo_1', 'deg', 0, 180),
+    ('Arm_Servo_2', 'deg', 0, 180),
+    ('Motor_Temp', 'C', 20, 85),
+    ('Motor_RPM', 'RPM', 0, 5000),
+    ('Battery_Voltage', 'V', 10, 14),
+    ('System_Load', '%', 0, 100),
+)
 
 DATA_INTERVAL = 1.0
 
+# Print progress about once a second whatever the tick rate
+LOG_EVERY = max(1, round(1 / DATA_INTERVAL))
+
+# Ticks buffered per transaction; raise it for long high-rate runs where the
+# per-commit fsync dominates, at the cost of the dashboard lagging behind
+COMMIT_EVERY = max(1, int(os.environ.get('MOCK_COMMIT_EVERY', 1)))
+
+
+# Sensor table as parallel arrays so a whole tick is sampled in one call
+SENSOR_NAMES, SENSOR_UNITS, _mins, _maxs = zip(*SENSORS)
+SENSOR_MINS = np.array(_mins, dtype=np.float64)
+SENSOR_MAXS = np.array(_maxs, dtype=np.float64)
+SENSOR_RANGES = SENSOR_MAXS - SENSOR_MINS
+SENSOR_COUNT = len(SENSORS)
+
+rng = np.random.default_rng()
 
-def get_status(value, sensor):
-    """Determine status based on value thresholds."""
-    range_size = sensor['max'] - sensor['min']
-    normalized = (value - sensor['min']) / range_size
-    
-    if normalized > 0.9:
-        return 'WARNING'
-    elif normalized > 0.95:
-        return 'ERROR'
-    return 'OK'
 
+def get_statuses(values):
+    """Determine status for each value from its position in the sensor range."""
+    normalized = (values - SENSOR_MINS) / SENSOR_RANGES
+    return np.where(normalized > 0.95, 'ERROR',
+                    np.where(normalized > 0.9, 'WARNING', 'OK'))
 
-def generate_sensor_data(sensor):
-    """Generate a random sensor reading."""
-    value = random.uniform(sensor['min'], sensor['max'])
-    status = get_status(value, sensor)
+
+def generate_sensor_data():
+    """Generate one random reading per sensor as insert-ready dicts."""
+    values = rng.uniform(SENSOR_MINS, SENSOR_MAXS)
+    statuses = get_statuses(values)
+    
+    return [
+        {'sensor_name': name, 'value': value, 'unit': unit, 'status': status}
+        for name, value, unit, status in zip(
+            SENSOR_NAMES, np.round(values, 2).tolist(), SENSOR_UNITS, statuses.tolist()
+        )
+    ]
+
+
+def flush_readings(conn, rows, emitter=None):
+    """Insert buffered readings with one executemany, commit and announce them."""
+    if rows:
+        conn.execute(SensorData.__table__.insert(), rows)
+        conn.commit()
+        if emitter is not None:
+            emitter.emit('sensor_update', {'created': len(rows)}, room='dashboard')
+        rows.clear()
+
+
+def create_emitter(app):
+    """
+    Build a Socket.IO emitter on the app's message queue, if it has one.
+    
+    The web server relays whatever is published there to its clients, so
+    dashboards get the same sensor_update push as for /api/ingest.
+    """
+    message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not message_queue:
+        return None
+    return SocketIO(message_queue=message_queue)
+
+
+def enable_fast_sqlite_writes(engine):
+    """Trade fsync durability for write speed on SQLite connections."""
+    if engine.dialect.name != 'sqlite':
+        return
     
-    return SensorData(
-        sensor_name=sensor['name'],
-        value=round(value, 2),
-        unit=sensor['unit'],
-        status=status
-    )
+    @event.listens_for(engine, 'connect')
+    def set_synchronous(dbapi_connection, connection_record):
+        # Losing the last tick of mock data on power loss is acceptable
+        dbapi_connection.execute('PRAGMA synchronous=NORMAL')
+    
+    # Drop pooled connections so every connection gets the pragma
+    engine.dispose()
 
 
 def main():
@@ -63,42 +115,56 @@ def main():
     print("=" * 60)
     print("MTI Mock Data Stream Generator")
     print("=" * 60)
-    print(f"Sensors: {len(SENSORS)}")
+    print(f"Sensors: {SENSOR_COUNT}")
     print(f"Interval: {DATA_INTERVAL}s")
     print("-" * 60)
     
     app = create_app('default')
     
     with app.app_context():
+        enable_fast_sqlite_writes(db.engine)
         db.create_all()
+        emitter = create_emitter(app)
+        if emitter is None:
+            print("REDIS_URL not set: dashboards will poll for new readings")
         
         print("Starting data generation...")
         print("Press Ctrl+C to stop.\n")
         
         iteration = 0
+        next_tick = time.monotonic()
+        pending = []
         
-        try:
-            while True:
-                iteration += 1
-                timestamp = datetime.utcnow()
-                
-                for sensor in SENSORS:
-                    data = generate_sensor_data(sensor)
-                    db.session.add(data)
-                
-                db.session.commit()
-                
-                print(f"[{timestamp.strftime('%H:%M:%S')}] Iteration {iteration}: "
-                      f"Inserted {len(SENSORS)} readings")
-                
-                time.sleep(DATA_INTERVAL)
-                
-        except KeyboardInterrupt:
-            print("\n" + "-" * 60)
-            print("Data generation stopped.")
-            print(f"Total iterations: {iteration}")
-            print(f"Total readings generated: {iteration * len(SENSORS)}")
-
+        with db.engine.connect() as conn:
+            try:
+                while True:
+                    iteration += 1
+                    next_tick += DATA_INTERVAL
+                    
+                    # Core executemany on one connection, no ORM session
+                    pending.extend(generate_sensor_data())
+                    if iteration % COMMIT_EVERY == 0:
+                        flush_readings(conn, pending, emitter)
+                    
+                    if iteration % LOG_EVERY == 0:
+                        timestamp = datetime.now(timezone.utc)
+                        print(f"[{timestamp:%H:%M:%S}] Iteration {iteration}: "
+                              f"Generated {SENSOR_COUNT} readings")
+                    
+                    # Sleep to the next deadline so insert time doesn't add drift;
+                    # after a stall, resume the cadence instead of bursting to catch up
+                    delay = next_tick - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_tick = time.monotonic()
+                    
+            except KeyboardInterrupt:
+                flush_readings(conn, pending, emitter)
+                print("\n" + "-" * 60)
+                print("Data generation stopped.")
+                print(f"Total iterations: {iteration}")
+                print(f"Total readings generated: {iteration * SENSOR_COUNT}")
 
 if __name__ == '__main__':
     main()
@@ -29,14 +29,19 @@ if not os.environ.get('SECRET_KEY'):
     os.environ['SECRET_KEY'] = temp_key
     print('NOTE: SECRET_KEY was not set; using a generated temporary SECRET_KEY for this run.')
 
+from sqlalchemy import update
+
 from app import create_app
 from app.extensions import db
 from app.models import User
+from app.models.user_models import hash_passwords
+
+
+PASSWORD_ALPHABET = string.ascii_letters + string.digits + string.punctuation
 
 
 def generate_password(length=16):
-    alphabet = string.ascii_letters + string.digits + string.punctuation
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    return ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(length))
 
 
 def reset_passwords(users, new_passwords):
@@ -44,9 +49,13 @@ def reset_passwords(users, new_passwords):
 
     This function expects to be called while an application context
     is active (so that db.session is the same session used to load users).
+    Passwords are hashed in parallel and written with one executemany UPDATE.
     """
-    for user, pwd in zip(users, new_passwords):
-        user.set_password(pwd)
+    hashes = hash_passwords(new_passwords)
+    db.session.execute(update(User), [
+        {'id': user.id, 'password_hash': password_hash}
+        for user, password_hash in zip(users, hashes)
+    ])
     db.session.commit()
 
 
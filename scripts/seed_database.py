@@ -4,139 +4,199 @@ Database seeding script for MTI (Miami Telemetry Interface)
 This script initializes the database with:
 - 5 default roles (Manager, Engineer, Operator, Investor, Audit)
 - Default permissions for each role
-- Default admin user (username: admin, password: admin123)
+- Admin user (username: admin) and one demo user per role, all with
+  randomly generated passwords
 
 Usage:
     python scripts/seed_database.py
 """
 
 import os
+import secrets
+import string
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dotenv import load_dotenv
-load_dotenv()
+from flask_migrate import stamp
+from sqlalchemy import inspect
 
 from app import create_app, db
-from app.models import User, Role, RolePermission, DEFAULT_PERMISSIONS
+from app.models import User, Role, RolePermission, DEFAULT_PERMISSION_MASKS
+from app.models.user_models import hash_passwords
+
+
+def insert_missing(model, conflict_column):
+    """
+    INSERT that silently skips rows whose conflict_column value already exists.
+    
+    Replaces a SELECT-then-INSERT round trip and is safe against concurrent
+    seeders. Supports the two databases MTI runs on, SQLite and PostgreSQL.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=[conflict_column])
 
 
 def seed_roles():
     """Create the 5 default roles."""
     roles = ['Manager', 'Engineer', 'Operator', 'Investor', 'Audit']
-    created = []
+    statement = insert_missing(Role, 'name').values(
+        [{'name': role_name} for role_name in roles]
+    ).returning(Role.name)
+    created = set(db.session.scalars(statement))
     
-    for role_name in roles:
-        role = Role.query.filter_by(name=role_name).first()
-        if role is None:
-            role = Role(name=role_name)
-            db.session.add(role)
-            created.append(role_name)
-            print(f"  Created role: {role_name}")
-        else:
-            print(f"  Role exists: {role_name}")
+    # Progress lines are collected and written once per seeder
+    print('\n'.join(
+        f"  Created role: {role_name}" if role_name in created
+        else f"  Role exists: {role_name}"
+        for role_name in roles
+    ))
     
-    db.session.commit()
-    return created
+    return [role_name for role_name in roles if role_name in created]
 
 
 def seed_permissions():
     """Create default permissions for each role."""
-    for role_name, perms in DEFAULT_PERMISSIONS.items():
-        role = Role.query.filter_by(name=role_name).first()
-        if not role:
-            print(f"  ERROR: Role '{role_name}' not found")
-            continue
-        
-        existing = RolePermission.query.filter_by(role_id=role.id).first()
-        if existing:
-            print(f"  Permissions exist for: {role_name}")
-            continue
-        
-        permission = RolePermission(
-            role_id=role.id,
-            can_view_panel_1=perms['can_view_panel_1'],
-            can_view_panel_2=perms['can_view_panel_2'],
-            can_view_panel_3=perms['can_view_panel_3'],
-            can_view_panel_4=perms['can_view_panel_4'],
-            can_export_data=perms['can_export_data'],
-            can_edit_data=perms['can_edit_data'],
-            can_manage_users=perms['can_manage_users'],
-            can_view_access_logs=perms['can_view_access_logs'],
+    role_ids = dict(
+        db.session.query(Role.name, Role.id).filter(Role.name.in_(DEFAULT_PERMISSION_MASKS))
+    )
+    
+    rows = [
+        {'role_id': role_ids[role_name], 'permissions_mask': mask}
+        for role_name, mask in DEFAULT_PERMISSION_MASKS.items()
+        if role_name in role_ids
+    ]
+    
+    created = set()
+    if rows:
+        statement = insert_missing(RolePermission, 'role_id').values(rows).returning(
+            RolePermission.role_id
         )
-        db.session.add(permission)
-        print(f"  Created permissions for: {role_name}")
+        created = set(db.session.scalars(statement))
     
-    db.session.commit()
+    lines = []
+    for role_name in DEFAULT_PERMISSION_MASKS:
+        role_id = role_ids.get(role_name)
+        if role_id is None:
+            lines.append(f"  ERROR: Role '{role_name}' not found")
+        elif role_id in created:
+            lines.append(f"  Created permissions for: {role_name}")
+        else:
+            lines.append(f"  Permissions exist for: {role_name}")
+    print('\n'.join(lines))
 
 
-def seed_admin():
-    """Create the default admin user with Manager role."""
-    import secrets
-    import string
-    
-    manager_role = Role.query.filter_by(name='Manager').first()
-    if manager_role is None:
-        print("  ERROR: Manager role not found. Run seed_roles first.")
-        return None
-    
-    admin = User.query.filter_by(username='admin').first()
-    if admin is None:
-        alphabet = string.ascii_letters + string.digits + '!@#$%^&*'
-        secure_password = ''.join(secrets.choice(alphabet) for _ in range(16))
-        
-        admin = User(username='admin', role_id=manager_role.id)
-        admin.set_password(secure_password)
-        db.session.add(admin)
-        db.session.commit()
-        print("  Created admin user (username: admin)")
-        print(f"  Generated secure password: {secure_password}")
-        print("  IMPORTANT: Save this password now! It will not be shown again.")
-        return admin
-    else:
-        print("  Admin user already exists")
-        return admin
+# Characters for generated passwords
+PASSWORD_ALPHABET = string.ascii_letters + string.digits + '!@#$%^&*'
+PASSWORD_LENGTH = 16
 
 
-def seed_demo_users():
-    """Create demo users for each role with secure random passwords."""
-    import secrets
-    import string
-    
-    demo_users = [
-        ('engineer1', 'Engineer'),
-        ('operator1', 'Operator'),
-        ('investor1', 'Investor'),
-        ('auditor1', 'Audit'),
-    ]
-    
+def generate_password():
+    """Generate a random password from the OS CSPRNG."""
+    return ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(PASSWORD_LENGTH))
+
+
+# (username, role) for the admin and the demo users, one per role
+SEED_USERS = (
+    ('admin', 'Manager'),
+    ('engineer1', 'Engineer'),
+    ('operator1', 'Operator'),
+    ('investor1', 'Investor'),
+    ('auditor1', 'Audit'),
+)
+
+
+def seed_users():
+    """Create the admin and demo users with secure random passwords."""
     generated_credentials = []
-    alphabet = string.ascii_letters + string.digits + '!@#$%^&*'
     
-    for username, role_name in demo_users:
-        role = Role.query.filter_by(name=role_name).first()
-        if role is None:
-            print(f"  ERROR: Role '{role_name}' not found")
+    # Two lookups for the whole list; the loop below only reads these
+    role_ids = dict(
+        db.session.query(Role.name, Role.id).filter(
+            Role.name.in_({role_name for _, role_name in SEED_USERS})
+        )
+    )
+    existing_users = {
+        username for (username,) in db.session.query(User.username).filter(
+            User.username.in_([username for username, _ in SEED_USERS])
+        )
+    }
+    
+    lines = []
+    new_role_ids = []
+    for username, role_name in SEED_USERS:
+        role_id = role_ids.get(role_name)
+        if role_id is None:
+            lines.append(f"  ERROR: Role '{role_name}' not found")
             continue
         
-        user = User.query.filter_by(username=username).first()
-        if user is None:
-            secure_password = ''.join(secrets.choice(alphabet) for _ in range(16))
-            user = User(username=username, role_id=role.id)
-            user.set_password(secure_password)
-            db.session.add(user)
+        if username not in existing_users:
+            secure_password = generate_password()
+            new_role_ids.append(role_id)
             generated_credentials.append((username, role_name, secure_password))
-            print(f"  Created user: {username} ({role_name})")
+            lines.append(f"  Created user: {username} ({role_name})")
         else:
-            print(f"  User exists: {username}")
+            lines.append(f"  User exists: {username}")
     
-    db.session.commit()
+    # Argon2 dominates seeding time, so every password is generated first and
+    # hashed in one parallel batch, then all users go in with one INSERT
+    hashes = hash_passwords([password for _, _, password in generated_credentials])
+    rows = [
+        {'username': username, 'role_id': role_id, 'password_hash': password_hash}
+        for (username, _, _), role_id, password_hash
+        in zip(generated_credentials, new_role_ids, hashes)
+    ]
+    if rows:
+        db.session.execute(insert_missing(User, 'username'), rows)
     
     if generated_credentials:
-        print("\n  Generated credentials (SAVE THESE NOW):")
-        for username, role_name, password in generated_credentials:
-            print(f"    {username} ({role_name}): {password}")
+        lines.append("\n  Generated credentials (SAVE THESE NOW):")
+        lines.extend(
+            f"    {username} ({role_name}): {password}"
+            for username, role_name, password in generated_credentials
+        )
+        lines.append("  IMPORTANT: Save these passwords now! They will not be shown again.")
+    print('\n'.join(lines))
+    
+    return generated_credentials
+
+
+def seed(app):
+    """
+    Create any missing tables and seed roles, permissions and users.
+    
+    Takes an existing app so callers that already built one (tests, other
+    scripts) reuse its engine instead of paying for a second create_app().
+    """
+    with app.app_context():
+        print("\nCreating database tables...")
+        # One catalog query instead of create_all()'s check per table
+        existing_tables = set(inspect(db.engine).get_table_names())
+        missing_tables = set(db.metadata.tables) - existing_tables
+        if missing_tables:
+            db.create_all()
+            if not existing_tables:
+                # Built from the current models, so already at the latest
+                # migration; later `flask db upgrade` runs start from here
+                stamp()
+            print("  Tables created successfully")
+        else:
+            print("  Tables already exist")
+        
+        # One transaction for every seeder: a single commit (and fsync), and
+        # a failed run leaves the database untouched
+        with db.session.begin():
+            print("\nSeeding roles...")
+            seed_roles()
+            
+            print("\nSeeding permissions...")
+            seed_permissions()
+            
+            print("\nSeeding users...")
+            seed_users()
 
 
 def main():
@@ -145,37 +205,20 @@ def main():
     print("MTI Database Seeding Script")
     print("=" * 60)
     
-    app = create_app('default')
+    seed(create_app('default'))
     
-    with app.app_context():
-        print("\nCreating database tables...")
-        db.create_all()
-        print("  Tables created successfully")
-        
-        print("\nSeeding roles...")
-        seed_roles()
-        
-        print("\nSeeding permissions...")
-        seed_permissions()
-        
-        print("\nSeeding admin user...")
-        seed_admin()
-        
-        print("\nSeeding demo users...")
-        seed_demo_users()
-        
-        print("\n" + "=" * 60)
-        print("Database seeding complete!")
-        print("=" * 60)
-        print("\nNOTE: All passwords are randomly generated at creation time.")
-        print("Check the output above for generated credentials.")
-        print("IMPORTANT: Save passwords immediately - they won't be shown again!")
-        print("\nDefault permissions (most restrictive to least):")
-        print("  Investor: Panels 1-2 only, no export")
-        print("  Audit:    Panels 1-3, export + access logs")
-        print("  Operator: All panels, no export")
-        print("  Engineer: All panels, export + edit")
-        print("  Manager:  Full access + admin")
+    print("\n" + "=" * 60)
+    print("Database seeding complete!")
+    print("=" * 60)
+    print("\nNOTE: All passwords are randomly generated at creation time.")
+    print("Check the output above for generated credentials.")
+    print("IMPORTANT: Save passwords immediately - they won't be shown again!")
+    print("\nDefault permissions (most restrictive to least):")
+    print("  Investor: Panels 1-2 only, no export")
+    print("  Audit:    Panels 1-3, export + access logs")
+    print("  Operator: All panels, no export")
+    print("  Engineer: All panels, export + edit")
+    print("  Manager:  Full access + admin")
 
 
 if __name__ == '__main__':
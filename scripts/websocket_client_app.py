@@ -4,250 +4,118 @@ Standalone WebSocket Client - DELETE WHEN DONE TESTING
 Run from a separate device to test WebSocket connectivity to the main MTI app.
 Usage: python websocket_client_app.py
 Then open http://localhost:5001 in your browser.
+
+When several testers share one host, serve it with gunicorn instead of the
+development server:
+    gunicorn -w 4 -b 0.0.0.0:5001 --chdir scripts websocket_client_app:app
 """
+import gzip
+import hashlib
 import os
-from flask import Flask, render_template_string
+from flask import Flask, Response, abort, request
 
 app = Flask(__name__)
-app.secret_key = os.environ.get('SECRET_KEY', 'dev-key')
-
-CLIENT_TEMPLATE = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MTI WebSocket Test Client</title>
-    <style>
-        * { box-sizing: border-box; margin: 0; padding: 0; }
-        body { font-family: system-ui, sans-serif; background: #F5F7FA; padding: 1rem; }
-        .container { max-width: 1200px; margin: 0 auto; }
-        h1 { color: #C3142D; font-size: 1.25rem; margin-bottom: 1rem; }
-        .grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; }
-        .grid-wide { grid-column: span 3; }
-        .grid-2 { grid-column: span 2; }
-        @media (max-width: 900px) { .grid { grid-template-columns: 1fr; } .grid-wide, .grid-2 { grid-column: span 1; } }
-        .card { background: white; border: 1px solid #E5E7EB; border-radius: 4px; }
-        .card-header { padding: 0.75rem 1rem; border-bottom: 1px solid #E5E7EB; font-weight: 600; font-size: 0.875rem; display: flex; justify-content: space-between; align-items: center; }
-        .card-body { padding: 1rem; }
-        .form-input { width: 100%; padding: 0.5rem; font-size: 0.875rem; border: 1px solid #D1D5DB; border-radius: 2px; margin-bottom: 0.5rem; font-family: inherit; }
-        .form-input:focus { outline: none; border-color: #C3142D; }
-        textarea.form-input { min-height: 60px; resize: vertical; font-family: monospace; }
-        .btn { padding: 0.5rem 1rem; font-size: 0.875rem; border: none; border-radius: 2px; cursor: pointer; background: #C3142D; color: white; }
-        .btn:hover { background: #A01025; }
-        .btn:disabled { background: #D1D5DB; cursor: not-allowed; }
-        .btn-block { width: 100%; }
-        .btn-sm { padding: 0.25rem 0.5rem; font-size: 0.75rem; }
-        .btn-outline { background: white; color: #000; border: 1px solid #D1D5DB; }
-        .btn-outline:hover { background: #F5F7FA; }
-        .row { display: flex; gap: 0.5rem; align-items: center; margin-bottom: 0.5rem; flex-wrap: wrap; }
-        .row .form-input { margin-bottom: 0; flex: 1; min-width: 150px; }
-        .status { width: 10px; height: 10px; border-radius: 50%; background: #C3142D; display: inline-block; }
-        .status.on { background: #059669; }
-        .display { background: #F5F7FA; padding: 1rem; text-align: center; border-radius: 4px; }
-        .display .val { font-size: 2rem; font-weight: 700; color: #C3142D; }
-        .display .val-sm { font-size: 1rem; word-break: break-word; }
-        .display .meta { font-size: 0.7rem; color: #757575; margin-top: 0.25rem; }
-        .stats-row { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.5rem; margin-bottom: 0.75rem; font-size: 0.75rem; text-align: center; }
-        .stats-row span { color: #757575; }
-        .log { background: #000; color: #0f0; font-family: monospace; font-size: 0.7rem; padding: 0.75rem; border-radius: 4px; max-height: 200px; overflow-y: auto; }
-        .received-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }
-        .json-display { background: #F5F7FA; padding: 0.75rem; border-radius: 4px; font-family: monospace; font-size: 0.7rem; max-height: 150px; overflow: auto; white-space: pre-wrap; word-break: break-word; }
-        .image-preview { max-width: 100%; max-height: 150px; border: 1px solid #E5E7EB; border-radius: 4px; display: block; margin-top: 0.5rem; }
-        .image-container { text-align: center; min-height: 50px; }
-        .image-placeholder { color: #757575; padding: 1rem; background: #F5F7FA; border-radius: 4px; font-size: 0.75rem; }
-        .env-badge { display: inline-block; padding: 0.25rem 0.5rem; font-size: 0.7rem; border-radius: 2px; font-weight: 600; }
-        .env-dev { background: #DBEAFE; color: #1D4ED8; }
-        .env-prod { background: #FEE2E2; color: #991B1B; }
-        .slider-container { display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.5rem; }
-        .slider-container input[type="range"] { flex: 1; }
-        .slider-container span { font-size: 0.75rem; min-width: 40px; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>MTI WebSocket Test Client</h1>
-        
-        <div class="grid">
-            <div class="card grid-wide">
-                <div class="card-header">
-                    Connection
-                    <span id="env-badge" class="env-badge env-dev">DEV</span>
-                </div>
-                <div class="card-body">
-                    <div class="row">
-                        <input type="text" id="server-url" class="form-input" value="http://localhost:5000">
-                        <button class="btn" id="connect-btn" onclick="toggleConnection()">Connect</button>
-                    </div>
-                    <div class="row">
-                        <button class="btn btn-sm btn-outline" onclick="setServer('http://localhost:5000')">Local (Dev)</button>
-                        <button class="btn btn-sm btn-outline" onclick="setServer('https://mti.wnusair.org')">Production</button>
-                        <span style="margin-left:auto;font-size:0.75rem;">
-                            <span class="status" id="status-dot"></span>
-                            <span id="status-text">Disconnected</span>
-                            &nbsp;|&nbsp;
-                            <span id="client-count">0</span> clients
-                        </span>
-                    </div>
-                </div>
-            </div>
-
-            <div class="card">
-                <div class="card-header">Latency Test</div>
-                <div class="card-body">
-                    <div class="display" style="margin-bottom:0.75rem">
-                        <div class="val"><span id="latency-value">--</span><span style="font-size:1rem;color:#757575">ms</span></div>
-                    </div>
-                    <div class="stats-row">
-                        <div><span>Min:</span> <span id="latency-min">--</span></div>
-                        <div><span>Avg:</span> <span id="latency-avg">--</span></div>
-                        <div><span>Max:</span> <span id="latency-max">--</span></div>
-                        <div><span>N:</span> <span id="latency-samples">0</span></div>
-                    </div>
-                    <div class="row">
-                        <button class="btn btn-sm" onclick="measureLatency()">Ping</button>
-                        <button class="btn btn-sm btn-outline" onclick="startAutoPing()">Auto</button>
-                        <button class="btn btn-sm btn-outline" onclick="stopAutoPing()">Stop</button>
-                        <button class="btn btn-sm btn-outline" onclick="clearLatency()">Reset</button>
-                    </div>
-                </div>
-            </div>
 
-            <div class="card">
-                <div class="card-header">Stress Test</div>
-                <div class="card-body">
-                    <div class="stats-row" style="grid-template-columns: repeat(3, 1fr);">
-                        <div><span>Sent:</span> <span id="stress-sent">0</span></div>
-                        <div><span>Recv:</span> <span id="stress-received">0</span></div>
-                        <div><span>Lost:</span> <span id="stress-lost">0</span></div>
-                    </div>
-                    <div class="row">
-                        <input type="number" id="stress-count" class="form-input" value="100" min="1" max="1000" style="flex:0 0 80px">
-                        <button class="btn btn-block" onclick="runStressTest()">Run Stress Test</button>
-                    </div>
-                </div>
-            </div>
-
-            <div class="card">
-                <div class="card-header">Send Number</div>
-                <div class="card-body">
-                    <input type="number" id="number-input" class="form-input" placeholder="Enter number">
-                    <button class="btn btn-block" onclick="sendNumber()">Send</button>
-                </div>
-            </div>
-
-            <div class="card">
-                <div class="card-header">Send Message</div>
-                <div class="card-body">
-                    <input type="text" id="message-input" class="form-input" placeholder="Enter message">
-                    <button class="btn btn-block" onclick="sendMessage()">Send</button>
-                </div>
-            </div>
-
-            <div class="card">
-                <div class="card-header">Send JSON</div>
-                <div class="card-body">
-                    <textarea id="json-input" class="form-input" placeholder='{"key": "value"}'></textarea>
-                    <button class="btn btn-block" onclick="sendJson()">Send</button>
-                </div>
-            </div>
-
-            <div class="card grid-wide">
-                <div class="card-header">Send Image</div>
-                <div class="card-body">
-                    <div class="row">
-                        <input type="file" id="image-input" accept="image/*" onchange="previewImage(event)" style="flex:1">
-                        <button class="btn" onclick="sendImage()">Send Image</button>
-                    </div>
-                    <div class="slider-container">
-                        <span>Quality:</span>
-                        <input type="range" id="image-quality" min="10" max="100" value="50">
-                        <span id="quality-value">50%</span>
-                    </div>
-                    <div class="slider-container">
-                        <span>Max Size:</span>
-                        <input type="range" id="image-maxsize" min="100" max="1000" value="400" step="50">
-                        <span id="maxsize-value">400px</span>
-                    </div>
-                    <div class="image-container">
-                        <img id="image-preview" class="image-preview" style="display:none">
-                        <div id="image-info" style="font-size:0.7rem;color:#757575;margin-top:0.25rem"></div>
-                    </div>
-                </div>
-            </div>
-
-            <div class="card grid-wide">
-                <div class="card-header">Received Data</div>
-                <div class="card-body">
-                    <div class="received-grid">
-                        <div class="display">
-                            <div class="val" id="received-number">--</div>
-                            <div class="meta">Number</div>
-                            <div class="meta" id="number-meta"></div>
-                        </div>
-                        <div class="display">
-                            <div class="val val-sm" id="received-message">--</div>
-                            <div class="meta">Message</div>
-                            <div class="meta" id="message-meta"></div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-
-            <div class="card grid-2">
-                <div class="card-header">Received JSON</div>
-                <div class="card-body">
-                    <pre class="json-display" id="received-json">No JSON received</pre>
-                    <div style="font-size:0.7rem;color:#757575;margin-top:0.25rem" id="json-meta"></div>
-                </div>
-            </div>
+CLIENT_CSS = '''
+* { box-sizing: border-box; margin: 0; padding: 0; }
+body { font-family: system-ui, sans-serif; background: #F5F7FA; padding: 1rem; }
+.container { max-width: 1200px; margin: 0 auto; }
+h1 { color: #C3142D; font-size: 1.25rem; margin-bottom: 1rem; }
+.grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; }
+.grid-wide { grid-column: span 3; }
+.grid-2 { grid-column: span 2; }
+@media (max-width: 900px) { .grid { grid-template-columns: 1fr; } .grid-wide, .grid-2 { grid-column: span 1; } }
+.card { background: white; border: 1px solid #E5E7EB; border-radius: 4px; }
+.card-header { padding: 0.75rem 1rem; border-bottom: 1px solid #E5E7EB; font-weight: 600; font-size: 0.875rem; display: flex; justify-content: space-between; align-items: center; }
+.card-body { padding: 1rem; }
+.form-input { width: 100%; padding: 0.5rem; font-size: 0.875rem; border: 1px solid #D1D5DB; border-radius: 2px; margin-bottom: 0.5rem; font-family: inherit; }
+.form-input:focus { outline: none; border-color: #C3142D; }
+textarea.form-input { min-height: 60px; resize: vertical; font-family: monospace; }
+.btn { padding: 0.5rem 1rem; font-size: 0.875rem; border: none; border-radius: 2px; cursor: pointer; background: #C3142D; color: white; }
+.btn:hover { background: #A01025; }
+.btn:disabled { background: #D1D5DB; cursor: not-allowed; }
+.btn-block { width: 100%; }
+.btn-sm { padding: 0.25rem 0.5rem; font-size: 0.75rem; }
+.btn-outline { background: white; color: #000; border: 1px solid #D1D5DB; }
+.btn-outline:hover { background: #F5F7FA; }
+.row { display: flex; gap: 0.5rem; align-items: center; margin-bottom: 0.5rem; flex-wrap: wrap; }
+.row .form-input { margin-bottom: 0; flex: 1; min-width: 150px; }
+.status { width: 10px; height: 10px; border-radius: 50%; background: #C3142D; display: inline-block; }
+.status.on { background: #059669; }
+.display { background: #F5F7FA; padding: 1rem; text-align: center; border-radius: 4px; }
+.display .val { font-size: 2rem; font-weight: 700; color: #C3142D; }
+.display .val-sm { font-size: 1rem; word-break: break-word; }
+.display .meta { font-size: 0.7rem; color: #757575; margin-top: 0.25rem; }
+.stats-row { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.5rem; margin-bottom: 0.75rem; font-size: 0.75rem; text-align: center; }
+.stats-row span { color: #757575; }
+.log { background: #000; color: #0f0; font-family: monospace; font-size: 0.7rem; padding: 0.75rem 0; border-radius: 4px; height: 200px; overflow-y: auto; }
+.log-spacer { position: relative; }
+.log-viewport { position: absolute; top: 0; left: 0; right: 0; }
+.log-row { height: 16px; line-height: 16px; padding: 0 0.75rem; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+.log-time { color: #757575; }
+.received-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }
+.json-display { background: #F5F7FA; padding: 0.75rem; border-radius: 4px; font-family: monospace; font-size: 0.7rem; max-height: 150px; overflow: auto; white-space: pre-wrap; word-break: break-word; }
+.image-preview { max-width: 100%; max-height: 150px; border: 1px solid #E5E7EB; border-radius: 4px; display: block; margin-top: 0.5rem; }
+.image-container { text-align: center; min-height: 50px; }
+.image-placeholder { color: #757575; padding: 1rem; background: #F5F7FA; border-radius: 4px; font-size: 0.75rem; }
+.env-badge { display: inline-block; padding: 0.25rem 0.5rem; font-size: 0.7rem; border-radius: 2px; font-weight: 600; }
+.env-dev { background: #DBEAFE; color: #1D4ED8; }
+.env-prod { background: #FEE2E2; color: #991B1B; }
+.slider-container { display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.5rem; }
+.slider-container input[type="range"] { flex: 1; }
+.slider-container span { font-size: 0.75rem; min-width: 40px; }
+'''
 
-            <div class="card">
-                <div class="card-header">Received Image</div>
-                <div class="card-body">
-                    <div class="image-container">
-                        <img id="received-image" class="image-preview" style="display:none;max-height:120px">
-                        <div id="received-image-placeholder" class="image-placeholder">No image received</div>
-                    </div>
-                    <div style="font-size:0.7rem;color:#757575;margin-top:0.25rem" id="image-meta"></div>
-                </div>
-            </div>
+CLIENT_JS = '''
+// Every element the handlers touch, looked up once at load
+const $ = Object.fromEntries([
+    'image-quality', 'quality-value', 'image-maxsize', 'maxsize-value',
+    'server-url', 'env-badge', 'status-dot', 'status-text', 'connect-btn',
+    'client-count', 'received-number', 'number-meta', 'received-message',
+    'message-meta', 'received-json', 'json-meta', 'received-image',
+    'received-image-placeholder', 'image-meta', 'stress-received', 'stress-lost',
+    'latency-value', 'latency-min', 'latency-avg', 'latency-max',
+    'latency-samples', 'stress-count', 'stress-sent', 'number-input',
+    'message-input', 'json-input', 'image-preview', 'image-info', 'image-input',
+    'event-log', 'log-spacer', 'log-viewport', 'polling-fallback'
+].map(id => [id, document.getElementById(id)]));
+
+// One formatter for every timestamp; it takes epoch ms directly, so no
+// per-event Date or locale lookup
+const TIME_FORMAT = new Intl.DateTimeFormat(undefined, { hour: '2-digit', minute: '2-digit', second: '2-digit' });
 
-            <div class="card grid-wide">
-                <div class="card-header">
-                    Event Log
-                    <button class="btn btn-sm btn-outline" onclick="clearLog()">Clear</button>
-                </div>
-                <div class="card-body" style="padding:0">
-                    <div class="log" id="event-log"></div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script src="https://cdn.socket.io/4.7.2/socket.io.min.js"></script>
-    <script>
 let socket = null;
 let isConnected = false;
 let pingInterval = null;
-let latencyData = { samples: [], min: null, max: null };
+// Last LATENCY_WINDOW samples in a ring buffer with a running sum, so each
+// pong is O(1) whatever the window size
+const LATENCY_WINDOW = 100;
+const latencyRing = new Float64Array(LATENCY_WINDOW);
+let latencyHead = 0;
+let latencyCount = 0;
+let latencySum = 0;
+let latencyLatest = null;
+let latencyMin = null;
+let latencyMax = null;
+let latencySaveTimer = null;
 let stressTestSent = 0;
 let stressTestReceived = 0;
+const STRESS_BATCH_SIZE = 50;
 
-document.getElementById('image-quality').oninput = function() {
-    document.getElementById('quality-value').textContent = this.value + '%';
+$['image-quality'].oninput = function() {
+    $['quality-value'].textContent = this.value + '%';
 };
-document.getElementById('image-maxsize').oninput = function() {
-    document.getElementById('maxsize-value').textContent = this.value + 'px';
+$['image-maxsize'].oninput = function() {
+    $['maxsize-value'].textContent = this.value + 'px';
 };
 
 function setServer(url) {
-    document.getElementById('server-url').value = url;
+    $['server-url'].value = url;
     updateEnvBadge(url);
 }
 
 function updateEnvBadge(url) {
-    const badge = document.getElementById('env-badge');
+    const badge = $['env-badge'];
     if (url.includes('localhost') || url.includes('127.0.0.1')) {
         badge.textContent = 'DEV';
         badge.className = 'env-badge env-dev';
@@ -267,15 +135,19 @@ function toggleConnection() {
 }
 
 function connect() {
-    const url = document.getElementById('server-url').value;
+    const url = $['server-url'].value;
     updateEnvBadge(url);
     log('Connecting to ' + url + '...');
     
+    // WebSocket-only skips the polling handshake and upgrade on every
+    // (re)connect; the fallback is there for proxies that block upgrades
+    const allowPolling = $['polling-fallback'].checked;
     socket = io(url, {
-        transports: ['polling', 'websocket'],
+        transports: allowPolling ? ['polling', 'websocket'] : ['websocket'],
+        upgrade: allowPolling,
         withCredentials: false,
-        upgrade: true,
-        rememberUpgrade: false
+        reconnectionDelay: 500,
+        reconnectionDelayMax: 5000
     });
     
     socket.io.on('open', function() {
@@ -288,18 +160,18 @@ function connect() {
     
     socket.on('connect', function() {
         isConnected = true;
-        document.getElementById('status-dot').classList.add('on');
-        document.getElementById('status-text').textContent = 'Connected';
-        document.getElementById('connect-btn').textContent = 'Disconnect';
+        $['status-dot'].classList.add('on');
+        $['status-text'].textContent = 'Connected';
+        $['connect-btn'].textContent = 'Disconnect';
         log('Connected to server (transport: ' + socket.io.engine.transport.name + ')');
         loadLatencyFromStorage();
     });
     
     socket.on('disconnect', function() {
         isConnected = false;
-        document.getElementById('status-dot').classList.remove('on');
-        document.getElementById('status-text').textContent = 'Disconnected';
-        document.getElementById('connect-btn').textContent = 'Connect';
+        $['status-dot'].classList.remove('on');
+        $['status-text'].textContent = 'Disconnected';
+        $['connect-btn'].textContent = 'Connect';
         log('Disconnected from server');
         stopAutoPing();
     });
@@ -313,55 +185,105 @@ function connect() {
     });
     
     socket.on('client_count', function(data) {
-        document.getElementById('client-count').textContent = data.count;
+        $['client-count'].textContent = data.count;
     });
     
     socket.on('pong_latency', function(data) {
-        const latency = Date.now() - data.client_time;
+        // Monotonic, sub-millisecond clock; the server echoes client_time as-is
+        const latency = Math.round((performance.now() - data.client_time) * 100) / 100;
         recordLatency(latency);
         log('Latency: ' + latency + 'ms');
     });
     
     socket.on('number_received', function(data) {
-        document.getElementById('received-number').textContent = data.value;
-        document.getElementById('number-meta').textContent = 'From: ' + data.sender + ' @ ' + new Date(data.timestamp).toLocaleTimeString();
+        pendingNumber = data;
+        scheduleReceivedRender();
         log('Number: ' + data.value + ' from ' + data.sender);
     });
     
+    socket.on('numbers_received', function(data) {
+        pendingNumber = {
+            value: data.values[data.values.length - 1],
+            sender: data.sender,
+            timestamp: data.timestamp
+        };
+        scheduleReceivedRender();
+        log('Numbers: ' + data.values.join(', ') + ' from ' + data.sender);
+    });
+    
     socket.on('message_received', function(data) {
-        document.getElementById('received-message').textContent = data.message;
-        document.getElementById('message-meta').textContent = 'From: ' + data.sender + ' @ ' + new Date(data.timestamp).toLocaleTimeString();
+        pendingMessage = data;
+        scheduleReceivedRender();
         log('Message: "' + data.message + '" from ' + data.sender);
     });
     
     socket.on('json_received', function(data) {
-        document.getElementById('received-json').textContent = JSON.stringify(data.payload, null, 2);
-        document.getElementById('json-meta').textContent = 'From: ' + data.sender + ' @ ' + new Date(data.timestamp).toLocaleTimeString();
+        const payload = data.payload instanceof ArrayBuffer
+            ? JSON.parse(jsonDecoder.decode(data.payload))
+            : data.payload;
+        $['received-json'].textContent = JSON.stringify(payload, null, 2);
+        $['json-meta'].textContent = 'From: ' + data.sender + ' @ ' + TIME_FORMAT.format(data.timestamp);
         log('JSON received from ' + data.sender);
     });
     
     socket.on('image_received', function(data) {
-        const img = document.getElementById('received-image');
-        const placeholder = document.getElementById('received-image-placeholder');
-        img.src = data.image;
-        img.style.display = 'block';
-        placeholder.style.display = 'none';
-        document.getElementById('image-meta').textContent = data.filename + ' from ' + data.sender;
+        const img = $['received-image'];
+        const placeholder = $['received-image-placeholder'];
+        showReceivedImage(img, data);
+        // Revealed only once decoded, so showing it costs a single layout
+        img.decode().then(function() {
+            img.style.display = 'block';
+            placeholder.style.display = 'none';
+        }).catch(function() {});
+        $['image-meta'].textContent = data.filename + ' from ' + data.sender;
         log('Image: ' + data.filename + ' from ' + data.sender);
     });
     
     socket.on('stress_test_response', function(data) {
         stressTestReceived++;
-        document.getElementById('stress-received').textContent = stressTestReceived;
-        document.getElementById('stress-lost').textContent = stressTestSent - stressTestReceived;
+        $['stress-received'].textContent = stressTestReceived;
+        $['stress-lost'].textContent = stressTestSent - stressTestReceived;
     });
 }
 
+function resetLatency() {
+    latencyHead = 0;
+    latencyCount = 0;
+    latencySum = 0;
+    latencyLatest = latencyMin = latencyMax = null;
+}
+
+function pushLatencySample(latency) {
+    if (latencyCount === LATENCY_WINDOW) {
+        latencySum -= latencyRing[latencyHead];
+    } else {
+        latencyCount++;
+    }
+    latencyRing[latencyHead] = latency;
+    latencyHead = (latencyHead + 1) % LATENCY_WINDOW;
+    latencySum += latency;
+    latencyLatest = latency;
+}
+
+function latencySamples() {
+    // Oldest first, matching the stored format
+    const start = (latencyHead - latencyCount + LATENCY_WINDOW) % LATENCY_WINDOW;
+    const samples = [];
+    for (let i = 0; i < latencyCount; i++) {
+        samples.push(latencyRing[(start + i) % LATENCY_WINDOW]);
+    }
+    return samples;
+}
+
 function loadLatencyFromStorage() {
     try {
         const stored = localStorage.getItem('latency_stats');
         if (stored) {
-            latencyData = JSON.parse(stored);
+            const data = JSON.parse(stored);
+            resetLatency();
+            data.samples.slice(-LATENCY_WINDOW).forEach(pushLatencySample);
+            latencyMin = data.min;
+            latencyMax = data.max;
             updateLatencyDisplay();
         }
     } catch (e) {}
@@ -369,33 +291,41 @@ function loadLatencyFromStorage() {
 
 function saveLatencyToStorage() {
     try {
-        localStorage.setItem('latency_stats', JSON.stringify(latencyData));
+        localStorage.setItem('latency_stats', JSON.stringify({
+            samples: latencySamples(), min: latencyMin, max: latencyMax
+        }));
     } catch (e) {}
 }
 
+// Serializing to localStorage is the expensive part; do it at most once a second
+function scheduleLatencySave() {
+    if (latencySaveTimer) return;
+    latencySaveTimer = setTimeout(function() {
+        latencySaveTimer = null;
+        saveLatencyToStorage();
+    }, 1000);
+}
+
 function recordLatency(latency) {
-    latencyData.samples.push(latency);
-    if (latencyData.samples.length > 100) latencyData.samples.shift();
-    if (latencyData.min === null || latency < latencyData.min) latencyData.min = latency;
-    if (latencyData.max === null || latency > latencyData.max) latencyData.max = latency;
-    saveLatencyToStorage();
+    pushLatencySample(latency);
+    if (latencyMin === null || latency < latencyMin) latencyMin = latency;
+    if (latencyMax === null || latency > latencyMax) latencyMax = latency;
+    scheduleLatencySave();
     updateLatencyDisplay();
 }
 
 function updateLatencyDisplay() {
-    if (latencyData.samples.length > 0) {
-        const latest = latencyData.samples[latencyData.samples.length - 1];
-        const avg = Math.round(latencyData.samples.reduce((a, b) => a + b, 0) / latencyData.samples.length);
-        document.getElementById('latency-value').textContent = latest;
-        document.getElementById('latency-min').textContent = latencyData.min + 'ms';
-        document.getElementById('latency-avg').textContent = avg + 'ms';
-        document.getElementById('latency-max').textContent = latencyData.max + 'ms';
-        document.getElementById('latency-samples').textContent = latencyData.samples.length;
+    if (latencyCount > 0) {
+        $['latency-value'].textContent = latencyLatest;
+        $['latency-min'].textContent = latencyMin + 'ms';
+        $['latency-avg'].textContent = (latencySum / latencyCount).toFixed(2) + 'ms';
+        $['latency-max'].textContent = latencyMax + 'ms';
+        $['latency-samples'].textContent = latencyCount;
     }
 }
 
 function measureLatency() {
-    if (isConnected) socket.emit('ping_latency', { client_time: Date.now() });
+    if (isConnected) socket.emit('ping_latency', { client_time: performance.now() });
 }
 
 function startAutoPing() {
@@ -413,154 +343,554 @@ function stopAutoPing() {
 }
 
 function clearLatency() {
-    latencyData = { samples: [], min: null, max: null };
+    resetLatency();
+    clearTimeout(latencySaveTimer);
+    latencySaveTimer = null;
     saveLatencyToStorage();
-    document.getElementById('latency-value').textContent = '--';
-    document.getElementById('latency-min').textContent = '--';
-    document.getElementById('latency-avg').textContent = '--';
-    document.getElementById('latency-max').textContent = '--';
-    document.getElementById('latency-samples').textContent = '0';
+    $['latency-value'].textContent = '--';
+    $['latency-min'].textContent = '--';
+    $['latency-avg'].textContent = '--';
+    $['latency-max'].textContent = '--';
+    $['latency-samples'].textContent = '0';
     log('Latency stats cleared');
 }
 
 function runStressTest() {
     if (!isConnected) { log('Not connected'); return; }
-    const count = parseInt(document.getElementById('stress-count').value) || 100;
+    const count = parseInt($['stress-count'].value) || 100;
     stressTestSent = 0;
     stressTestReceived = 0;
-    document.getElementById('stress-sent').textContent = '0';
-    document.getElementById('stress-received').textContent = '0';
-    document.getElementById('stress-lost').textContent = '0';
+    $['stress-sent'].textContent = '0';
+    $['stress-received'].textContent = '0';
+    $['stress-lost'].textContent = '0';
     log('Stress test: ' + count + ' messages');
     
-    for (let i = 0; i < count; i++) {
-        setTimeout(function() {
+    // Emit a batch per animation frame rather than one timer per message;
+    // the sent counter is updated once per batch
+    let i = 0;
+    function pump() {
+        const end = Math.min(i + STRESS_BATCH_SIZE, count);
+        for (; i < end; i++) {
             socket.emit('stress_test', { sequence: i });
-            stressTestSent++;
-            document.getElementById('stress-sent').textContent = stressTestSent;
-        }, i * 10);
+        }
+        stressTestSent = i;
+        $['stress-sent'].textContent = stressTestSent;
+        if (i < count && isConnected) requestAnimationFrame(pump);
     }
+    pump();
 }
 
+// The first number goes out immediately; any sent within the following
+// NUMBER_BATCH_MS are queued and emitted together as one send_numbers frame
+const NUMBER_BATCH_MS = 20;
+let numberQueue = [];
+let numberFlushTimer = null;
+
 function sendNumber() {
-    const v = document.getElementById('number-input').value;
+    const v = $['number-input'].value;
     if (v && isConnected) {
-        socket.emit('send_number', { value: parseFloat(v) });
+        if (numberFlushTimer === null) {
+            socket.emit('send_number', { value: parseFloat(v) });
+            numberFlushTimer = setTimeout(flushNumbers, NUMBER_BATCH_MS);
+        } else {
+            numberQueue.push(parseFloat(v));
+        }
         log('Sent number: ' + v);
-        document.getElementById('number-input').value = '';
+        $['number-input'].value = '';
     }
 }
 
+function flushNumbers() {
+    numberFlushTimer = null;
+    if (numberQueue.length === 0) return;
+    if (isConnected) {
+        socket.emit('send_numbers', { values: numberQueue });
+        numberFlushTimer = setTimeout(flushNumbers, NUMBER_BATCH_MS);
+    }
+    numberQueue = [];
+}
+
 function sendMessage() {
-    const m = document.getElementById('message-input').value;
+    const m = $['message-input'].value;
     if (m.trim() && isConnected) {
         socket.emit('broadcast_message', { message: m });
         log('Sent message: "' + m + '"');
-        document.getElementById('message-input').value = '';
+        $['message-input'].value = '';
     }
 }
 
+const jsonEncoder = new TextEncoder();
+const jsonDecoder = new TextDecoder();
+
 function sendJson() {
-    const str = document.getElementById('json-input').value;
+    const str = $['json-input'].value;
     try {
-        const payload = JSON.parse(str);
-        socket.emit('send_json', { payload: payload });
+        // Validated once here, then sent as UTF-8 bytes in a binary frame
+        // that the server relays without re-parsing
+        JSON.parse(str);
+        socket.emit('send_json', { payload: jsonEncoder.encode(str) });
         log('Sent JSON');
-        document.getElementById('json-input').value = '';
+        $['json-input'].value = '';
     } catch (e) {
         log('Invalid JSON: ' + e.message);
     }
 }
 
+let receivedImageUrl = null;
+
+// Binary images become an object URL (the previous one is released);
+// base64 data URLs from older clients are used directly
+function showReceivedImage(img, data) {
+    if (receivedImageUrl) {
+        URL.revokeObjectURL(receivedImageUrl);
+        receivedImageUrl = null;
+    }
+    if (typeof data.image === 'string') {
+        img.src = data.image;
+    } else {
+        receivedImageUrl = URL.createObjectURL(new Blob([data.image], { type: data.mime || 'image/jpeg' }));
+        img.src = receivedImageUrl;
+    }
+}
+
+let previewImageUrl = null;
+
+// Previews straight from the File through an object URL, skipping the
+// base64 round trip, and reveals it once decoded
 function previewImage(event) {
     const file = event.target.files[0];
     if (!file) return;
     
-    const reader = new FileReader();
-    reader.onload = function(e) {
-        const img = document.getElementById('image-preview');
-        img.src = e.target.result;
-        img.style.display = 'block';
-        
-        const originalSize = Math.round(e.target.result.length / 1024);
-        document.getElementById('image-info').textContent = 'Original: ' + originalSize + 'KB';
-    };
-    reader.readAsDataURL(file);
+    if (previewImageUrl) URL.revokeObjectURL(previewImageUrl);
+    previewImageUrl = URL.createObjectURL(file);
+    const img = $['image-preview'];
+    img.src = previewImageUrl;
+    img.decode().then(function() { img.style.display = 'block'; }).catch(function() {});
+    
+    $['image-info'].textContent = 'Original: ' + Math.round(file.size / 1024) + 'KB';
 }
 
-function sendImage() {
-    const input = document.getElementById('image-input');
-    const file = input.files[0];
-    if (!file) { log('No image selected'); return; }
-    if (!isConnected) { log('Not connected'); return; }
-    
-    const quality = parseInt(document.getElementById('image-quality').value) / 100;
-    const maxSize = parseInt(document.getElementById('image-maxsize').value);
-    
-    const reader = new FileReader();
-    reader.onload = function(e) {
-        const img = new Image();
-        img.onload = function() {
-            const canvas = document.createElement('canvas');
-            let width = img.width;
-            let height = img.height;
-            
-            if (width > maxSize || height > maxSize) {
-                if (width > height) {
-                    height = Math.round(height * maxSize / width);
-                    width = maxSize;
-                } else {
-                    width = Math.round(width * maxSize / height);
-                    height = maxSize;
-                }
+// Resizing and JPEG encoding run in a worker so large photos don't stall
+// the event log or auto-ping while they compress
+const IMAGE_WORKER_SRC = `
+self.onmessage = async function(e) {
+    const { file, maxSize, quality } = e.data;
+    try {
+        const bitmap = await createImageBitmap(file);
+        let width = bitmap.width;
+        let height = bitmap.height;
+        if (width > maxSize || height > maxSize) {
+            if (width > height) {
+                height = Math.round(height * maxSize / width);
+                width = maxSize;
+            } else {
+                width = Math.round(width * maxSize / height);
+                height = maxSize;
             }
+        }
+        const canvas = new OffscreenCanvas(width, height);
+        canvas.getContext('2d').drawImage(bitmap, 0, 0, width, height);
+        bitmap.close();
+        const blob = await canvas.convertToBlob({ type: 'image/jpeg', quality: quality });
+        const buffer = await blob.arrayBuffer();
+        self.postMessage({ name: file.name, buffer: buffer, width: width, height: height }, [buffer]);
+    } catch (err) {
+        self.postMessage({ name: file.name, error: String(err) });
+    }
+};
+`;
+
+let imageWorker = null;
+
+function getImageWorker() {
+    if (!imageWorker) {
+        const url = URL.createObjectURL(new Blob([IMAGE_WORKER_SRC], { type: 'application/javascript' }));
+        imageWorker = new Worker(url);
+        URL.revokeObjectURL(url);
+        imageWorker.onmessage = function(e) {
+            const result = e.data;
+            if (result.error) { log('Image encoding failed: ' + result.error); return; }
+            if (!isConnected) { log('Not connected'); return; }
             
-            canvas.width = width;
-            canvas.height = height;
-            const ctx = canvas.getContext('2d');
-            ctx.drawImage(img, 0, 0, width, height);
-            
-            const compressedData = canvas.toDataURL('image/jpeg', quality);
-            const compressedSize = Math.round(compressedData.length / 1024);
-            
-            log('Sending image: ' + file.name + ' (' + compressedSize + 'KB, ' + width + 'x' + height + ')');
+            const compressedSize = Math.round(result.buffer.byteLength / 1024);
+            log('Sending image: ' + result.name + ' (' + compressedSize + 'KB, ' + result.width + 'x' + result.height + ')');
             
+            // Raw JPEG bytes go out as a binary frame, a third smaller than base64
             socket.emit('send_image', {
-                image: compressedData,
-                filename: file.name
+                image: result.buffer,
+                mime: 'image/jpeg',
+                filename: result.name
             });
         };
-        img.src = e.target.result;
-    };
-    reader.readAsDataURL(file);
+    }
+    return imageWorker;
+}
+
+function sendImage() {
+    const input = $['image-input'];
+    const file = input.files[0];
+    if (!file) { log('No image selected'); return; }
+    if (!isConnected) { log('Not connected'); return; }
+    
+    const quality = parseInt($['image-quality'].value) / 100;
+    const maxSize = parseInt($['image-maxsize'].value);
+    
+    getImageWorker().postMessage({ file: file, maxSize: maxSize, quality: quality });
 }
 
+// Received numbers and messages only keep the latest of each per frame, so
+// a flood costs at most one set of writes per animation frame
+let pendingNumber = null;
+let pendingMessage = null;
+let receivedRenderPending = false;
+
+function scheduleReceivedRender() {
+    if (!receivedRenderPending) {
+        receivedRenderPending = true;
+        requestAnimationFrame(renderReceived);
+    }
+}
+
+function renderReceived() {
+    receivedRenderPending = false;
+    if (pendingNumber) {
+        $['received-number'].textContent = pendingNumber.value;
+        $['number-meta'].textContent = 'From: ' + pendingNumber.sender + ' @ ' + TIME_FORMAT.format(pendingNumber.timestamp);
+        pendingNumber = null;
+    }
+    if (pendingMessage) {
+        $['received-message'].textContent = pendingMessage.message;
+        $['message-meta'].textContent = 'From: ' + pendingMessage.sender + ' @ ' + TIME_FORMAT.format(pendingMessage.timestamp);
+        pendingMessage = null;
+    }
+}
+
+// The log is virtualized: lines live in an array and only the rows in view
+// (plus a little overscan) exist in the DOM, recycled on every render
+const LOG_MAX_LINES = 5000;
+const LOG_ROW_HEIGHT = 16;
+const LOG_OVERSCAN = 10;
+const logLines = [];
+const logRows = [];
+let logFollowing = true;
+let logRenderPending = false;
+
 function clearLog() {
-    document.getElementById('event-log').innerHTML = '';
+    logLines.length = 0;
+    logFollowing = true;
+    scheduleLogRender();
 }
 
 function log(msg) {
-    const el = document.getElementById('event-log');
-    const time = new Date().toLocaleTimeString();
-    el.innerHTML += '<span style="color:#757575">[' + time + ']</span> ' + msg + '\\n';
-    el.scrollTop = el.scrollHeight;
+    logLines.push([TIME_FORMAT.format(Date.now()), msg]);
+    scheduleLogRender();
 }
 
-document.getElementById('number-input').onkeypress = function(e) { if (e.key === 'Enter') sendNumber(); };
-document.getElementById('message-input').onkeypress = function(e) { if (e.key === 'Enter') sendMessage(); };
-document.getElementById('server-url').oninput = function() { updateEnvBadge(this.value); };
-    </script>
+// Bursts of lines and scroll events cost one render per animation frame
+function scheduleLogRender() {
+    if (!logRenderPending) {
+        logRenderPending = true;
+        requestAnimationFrame(renderLog);
+    }
+}
+
+function renderLog() {
+    logRenderPending = false;
+    const el = $['event-log'];
+    if (logLines.length > LOG_MAX_LINES) {
+        logLines.splice(0, logLines.length - LOG_MAX_LINES);
+    }
+    $['log-spacer'].style.height = logLines.length * LOG_ROW_HEIGHT + 'px';
+    if (logFollowing && !document.hidden) {
+        el.scrollTop = el.scrollHeight;
+    }
+    
+    const first = Math.floor(el.scrollTop / LOG_ROW_HEIGHT);
+    const count = Math.ceil(el.clientHeight / LOG_ROW_HEIGHT) + LOG_OVERSCAN;
+    while (logRows.length < count) {
+        const row = document.createElement('div');
+        const stamp = document.createElement('span');
+        row.className = 'log-row';
+        stamp.className = 'log-time';
+        row.append(stamp, document.createTextNode(''));
+        $['log-viewport'].appendChild(row);
+        logRows.push(row);
+    }
+    // Messages are written as text, never parsed as HTML
+    for (let i = 0; i < logRows.length; i++) {
+        const row = logRows[i];
+        const line = logLines[first + i];
+        row.hidden = !line;
+        if (line) {
+            row.firstChild.textContent = '[' + line[0] + '] ';
+            row.lastChild.data = line[1];
+        }
+    }
+    $['log-viewport'].style.transform = 'translateY(' + first * LOG_ROW_HEIGHT + 'px)';
+}
+
+// Follow new output only while the reader is at the bottom of the log
+$['event-log'].onscroll = function() {
+    const el = $['event-log'];
+    logFollowing = el.scrollHeight - el.scrollTop - el.clientHeight < LOG_ROW_HEIGHT;
+    scheduleLogRender();
+};
+
+$['number-input'].onkeypress = function(e) { if (e.key === 'Enter') sendNumber(); };
+$['message-input'].onkeypress = function(e) { if (e.key === 'Enter') sendMessage(); };
+const ENV_BADGE_DEBOUNCE_MS = 150;
+let envBadgeTimer = null;
+// Re-badge once typing pauses rather than on every keystroke
+$['server-url'].oninput = function() {
+    clearTimeout(envBadgeTimer);
+    envBadgeTimer = setTimeout(function() { updateEnvBadge($['server-url'].value); }, ENV_BADGE_DEBOUNCE_MS);
+};
+'''
+
+CLIENT_TEMPLATE = '''
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>MTI WebSocket Test Client</title>
+    <link rel="stylesheet" href="/assets/client.css?v=__CSS_VERSION__">
+</head>
+<body>
+    <div class="container">
+        <h1>MTI WebSocket Test Client</h1>
+        
+        <div class="grid">
+            <div class="card grid-wide">
+                <div class="card-header">
+                    Connection
+                    <span id="env-badge" class="env-badge env-dev">DEV</span>
+                </div>
+                <div class="card-body">
+                    <div class="row">
+                        <input type="text" id="server-url" class="form-input" value="http://localhost:5000">
+                        <button class="btn" id="connect-btn" onclick="toggleConnection()">Connect</button>
+                    </div>
+                    <div class="row">
+                        <button class="btn btn-sm btn-outline" onclick="setServer('http://localhost:5000')">Local (Dev)</button>
+                        <button class="btn btn-sm btn-outline" onclick="setServer('https://mti.wnusair.org')">Production</button>
+                        <label style="font-size:0.75rem;"><input type="checkbox" id="polling-fallback"> Polling fallback</label>
+                        <span style="margin-left:auto;font-size:0.75rem;">
+                            <span class="status" id="status-dot"></span>
+                            <span id="status-text">Disconnected</span>
+                            &nbsp;|&nbsp;
+                            <span id="client-count">0</span> clients
+                        </span>
+                    </div>
+                </div>
+            </div>
+
+            <div class="card">
+                <div class="card-header">Latency Test</div>
+                <div class="card-body">
+                    <div class="display" style="margin-bottom:0.75rem">
+                        <div class="val"><span id="latency-value">--</span><span style="font-size:1rem;color:#757575">ms</span></div>
+                    </div>
+                    <div class="stats-row">
+                        <div><span>Min:</span> <span id="latency-min">--</span></div>
+                        <div><span>Avg:</span> <span id="latency-avg">--</span></div>
+                        <div><span>Max:</span> <span id="latency-max">--</span></div>
+                        <div><span>N:</span> <span id="latency-samples">0</span></div>
+                    </div>
+                    <div class="row">
+                        <button class="btn btn-sm" onclick="measureLatency()">Ping</button>
+                        <button class="btn btn-sm btn-outline" onclick="startAutoPing()">Auto</button>
+                        <button class="btn btn-sm btn-outline" onclick="stopAutoPing()">Stop</button>
+                        <button class="btn btn-sm btn-outline" onclick="clearLatency()">Reset</button>
+                    </div>
+                </div>
+            </div>
+
+            <div class="card">
+                <div class="card-header">Stress Test</div>
+                <div class="card-body">
+                    <div class="stats-row" style="grid-template-columns: repeat(3, 1fr);">
+                        <div><span>Sent:</span> <span id="stress-sent">0</span></div>
+                        <div><span>Recv:</span> <span id="stress-received">0</span></div>
+                        <div><span>Lost:</span> <span id="stress-lost">0</span></div>
+                    </div>
+                    <div class="row">
+                        <input type="number" id="stress-count" class="form-input" value="100" min="1" max="1000" style="flex:0 0 80px">
+                        <button class="btn btn-block" onclick="runStressTest()">Run Stress Test</button>
+                    </div>
+                </div>
+            </div>
+
+            <div class="card">
+                <div class="card-header">Send Number</div>
+                <div class="card-body">
+                    <input type="number" id="number-input" class="form-input" placeholder="Enter number">
+                    <button class="btn btn-block" onclick="sendNumber()">Send</button>
+                </div>
+            </div>
+
+            <div class="card">
+                <div class="card-header">Send Message</div>
+                <div class="card-body">
+                    <input type="text" id="message-input" class="form-input" placeholder="Enter message">
+                    <button class="btn btn-block" onclick="sendMessage()">Send</button>
+                </div>
+            </div>
+
+            <div class="card">
+                <div class="card-header">Send JSON</div>
+                <div class="card-body">
+                    <textarea id="json-input" class="form-input" placeholder='{"key": "value"}'></textarea>
+                    <button class="btn btn-block" onclick="sendJson()">Send</button>
+                </div>
+            </div>
+
+            <div class="card grid-wide">
+                <div class="card-header">Send Image</div>
+                <div class="card-body">
+                    <div class="row">
+                        <input type="file" id="image-input" accept="image/*" onchange="previewImage(event)" style="flex:1">
+                        <button class="btn" onclick="sendImage()">Send Image</button>
+                    </div>
+                    <div class="slider-container">
+                        <span>Quality:</span>
+                        <input type="range" id="image-quality" min="10" max="100" value="50">
+                        <span id="quality-value">50%</span>
+                    </div>
+                    <div class="slider-container">
+                        <span>Max Size:</span>
+                        <input type="range" id="image-maxsize" min="100" max="1000" value="400" step="50">
+                        <span id="maxsize-value">400px</span>
+                    </div>
+                    <div class="image-container">
+                        <img id="image-preview" class="image-preview" decoding="async" style="display:none">
+                        <div id="image-info" style="font-size:0.7rem;color:#757575;margin-top:0.25rem"></div>
+                    </div>
+                </div>
+            </div>
+
+            <div class="card grid-wide">
+                <div class="card-header">Received Data</div>
+                <div class="card-body">
+                    <div class="received-grid">
+                        <div class="display">
+                            <div class="val" id="received-number">--</div>
+                            <div class="meta">Number</div>
+                            <div class="meta" id="number-meta"></div>
+                        </div>
+                        <div class="display">
+                            <div class="val val-sm" id="received-message">--</div>
+                            <div class="meta">Message</div>
+                            <div class="meta" id="message-meta"></div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+
+            <div class="card grid-2">
+                <div class="card-header">Received JSON</div>
+                <div class="card-body">
+                    <pre class="json-display" id="received-json">No JSON received</pre>
+                    <div style="font-size:0.7rem;color:#757575;margin-top:0.25rem" id="json-meta"></div>
+                </div>
+            </div>
+
+            <div class="card">
+                <div class="card-header">Received Image</div>
+                <div class="card-body">
+                    <div class="image-container">
+                        <img id="received-image" class="image-preview" decoding="async" style="display:none;max-height:120px">
+                        <div id="received-image-placeholder" class="image-placeholder">No image received</div>
+                    </div>
+                    <div style="font-size:0.7rem;color:#757575;margin-top:0.25rem" id="image-meta"></div>
+                </div>
+            </div>
+
+            <div class="card grid-wide">
+                <div class="card-header">
+                    Event Log
+                    <button class="btn btn-sm btn-outline" onclick="clearLog()">Clear</button>
+                </div>
+                <div class="card-body" style="padding:0">
+                    <div class="log" id="event-log">
+                        <div class="log-spacer" id="log-spacer">
+                            <div class="log-viewport" id="log-viewport"></div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <script src="https://cdn.socket.io/4.7.2/socket.io.min.js"></script>
+    <script src="/assets/client.js?v=__JS_VERSION__"></script>
 </body>
 </html>
 '''
 
+def build_asset(text, mimetype):
+    """Encode and gzip a static text asset once, with a content-hash ETag."""
+    body = text.encode('utf-8')
+    return {
+        'body': body,
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+        'etag': hashlib.md5(body, usedforsecurity=False).hexdigest(),
+        'mimetype': mimetype,
+    }
+
+
+def asset_response(asset):
+    """Serve a prebuilt asset, gzipped when accepted, honouring If-None-Match."""
+    gzipped = bool(request.accept_encodings['gzip'])
+    # Each encoding is a separate representation and needs its own tag
+    etag = asset['etag'] + '-gzip' if gzipped else asset['etag']
+    # Revalidations are the common case on reload; answer them without
+    # building a body response at all
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif gzipped:
+        response = Response(asset['gzip'], mimetype=asset['mimetype'])
+        response.content_encoding = 'gzip'
+    else:
+        response = Response(asset['body'], mimetype=asset['mimetype'])
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+# The stylesheet and script are separate assets, versioned by content hash in
+# their URLs, so browsers cache them for good and reloads only fetch the HTML
+STATIC_ASSETS = {
+    'client.css': build_asset(CLIENT_CSS, 'text/css'),
+    'client.js': build_asset(CLIENT_JS, 'text/javascript'),
+}
+CLIENT_PAGE = build_asset(
+    CLIENT_TEMPLATE
+    .replace('__CSS_VERSION__', STATIC_ASSETS['client.css']['etag'])
+    .replace('__JS_VERSION__', STATIC_ASSETS['client.js']['etag']),
+    'text/html'
+)
+
 @app.route('/')
 def index():
     """Serve the WebSocket test client page."""
-    return render_template_string(CLIENT_TEMPLATE)
+    return asset_response(CLIENT_PAGE)
+
+@app.route('/assets/<name>')
+def static_asset(name):
+    """Serve the client stylesheet or script with a long-lived cache policy."""
+    asset = STATIC_ASSETS.get(name)
+    if asset is None:
+        abort(404)
+    response = asset_response(asset)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
 
 if __name__ == '__main__':
     print('MTI WebSocket Test Client')
     print('Open http://localhost:5001 in your browser')
     print('Connect to your MTI server (local or production)')
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    debug_mode = os.environ.get('FLASK_DEBUG', '0') == '1'
+    app.run(host='0.0.0.0', port=5001, debug=debug_mode, threaded=True)
@@ -8,16 +8,30 @@ import pytest
 import json
 from io import BytesIO
 from datetime import datetime, timedelta
+from flask_migrate import upgrade
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
 from app import create_app, db
 from app.models import User, Role, SensorData, RolePermission, DEFAULT_PERMISSIONS
+from app.models.user_models import hash_passwords
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def app():
-    """Create application for testing."""
+    """Create the application, with its schema and roles seeded once per run."""
     app = create_app('testing')
     
     with app.app_context():
+        # pysqlite defers BEGIN and mishandles SAVEPOINT; take over transaction
+        # control so each test can be rolled back (see db_session)
+        @event.listens_for(db.engine, 'connect')
+        def disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(db.engine, 'begin')
+        def emit_begin(connection):
+            connection.exec_driver_sql('BEGIN')
+
         db.create_all()
         
         roles = ['Manager', 'Engineer', 'Operator', 'Investor', 'Audit']
@@ -42,11 +56,35 @@ def app():
                 )
                 db.session.add(permission)
         db.session.commit()
+        db.session.remove()
+    
+    yield app
+    
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def db_session(app):
+    """Run each test in an outer transaction that is rolled back afterwards.
+
+    db.session is swapped for one bound to that transaction; commits made by
+    tests and views only release savepoints inside it. The app context is
+    per test too, so nothing cached on g (like the logged-in user) leaks.
+    """
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        app_session = db.session
+        # A plain Session: Flask-SQLAlchemy's always binds to its own engine
+        db.session = scoped_session(sessionmaker(bind=connection, join_transaction_mode='create_savepoint'))
         
-        yield app
+        yield db.session
         
         db.session.remove()
-        db.drop_all()
+        db.session = app_session
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture
@@ -120,6 +158,29 @@ class TestModels:
             assert user.check_password('mysecretpassword') is True
             assert user.check_password('wrongpassword') is False
     
+    def test_legacy_password_hash_upgraded(self, app):
+        """Test Werkzeug hashes still verify and are rehashed with Argon2id."""
+        from werkzeug.security import generate_password_hash
+        with app.app_context():
+            user = User(username='legacy', password_hash=generate_password_hash('oldpass'))
+            
+            assert user.check_password('wrongpassword') is False
+            assert not user.password_hash.startswith('$argon2id$')
+            assert user.check_password('oldpass') is True
+            assert user.password_hash.startswith('$argon2id$')
+            assert user.check_password('oldpass') is True
+    
+    def test_hash_passwords_in_parallel(self, app):
+        """Test batch-hashed passwords verify like set_password() ones."""
+        with app.app_context():
+            hashes = hash_passwords(['first-pass', 'second-pass'])
+            users = [User(username=f'batch{i}', password_hash=h) for i, h in enumerate(hashes)]
+            
+            assert hashes[0] != hashes[1]
+            assert users[0].check_password('first-pass')
+            assert users[1].check_password('second-pass')
+            assert not users[1].check_password('first-pass')
+    
     def test_user_roles(self, app):
         """Test user role assignment."""
         with app.app_context():
@@ -148,6 +209,20 @@ class TestModels:
             assert retrieved.value == 42.5
             assert isinstance(retrieved.value, float)
     
+    def test_sensor_data_bulk_insert(self, app):
+        """Test bulk_insert returns generated ids and timestamps in order."""
+        with app.app_context():
+            rows = [
+                {'sensor_name': f'Sensor_{i}', 'value': float(i), 'unit': 'deg', 'status': 'OK'}
+                for i in range(3)
+            ]
+            result = SensorData.bulk_insert(rows).all()
+            db.session.commit()
+            
+            stored = {s.id: s.sensor_name for s in SensorData.query.all()}
+            assert [stored[record_id] for record_id, _ in result] == ['Sensor_0', 'Sensor_1', 'Sensor_2']
+            assert all(timestamp is not None for _, timestamp in result)
+    
     def test_sensor_data_to_dict(self, app):
         """Test SensorData to_dict method."""
         with app.app_context():
@@ -179,6 +254,20 @@ class TestModels:
             assert perms.can_view_panel_3 is False
             assert perms.can_export_data is False
             assert perms.can_manage_users is False
+    
+    def test_sensor_data_indexes(self, app):
+        """Test sensor_data has only the composite timestamp indexes."""
+        with app.app_context():
+            names = {index['name'] for index in db.inspect(db.engine).get_indexes('sensor_data')}
+            assert names == {'ix_sensor_data_sensor_timestamp', 'ix_sensor_data_timestamp_sensor_status_value'}
+    
+    def test_migrations_create_sensor_data_indexes(self):
+        """Test upgrading an existing database gives it the same indexes."""
+        app = create_app('testing')
+        with app.app_context():
+            upgrade()
+            names = {index['name'] for index in db.inspect(db.engine).get_indexes('sensor_data')}
+            assert names == {'ix_sensor_data_sensor_timestamp', 'ix_sensor_data_timestamp_sensor_status_value'}
 
 
 class TestAuthentication:
@@ -215,6 +304,16 @@ class TestAuthentication:
         
         assert b'Invalid username or password' in response.data
     
+    def test_login_unknown_user_still_checks_a_hash(self, client, monkeypatch):
+        """Test unknown usernames cost a hash check like real ones."""
+        from app.blueprints.auth import routes as auth_routes
+        checked = []
+        monkeypatch.setattr(auth_routes, 'check_dummy_password', checked.append)
+        
+        client.post('/auth/login', data={'username': 'nonexistent', 'password': 'wrongpass'})
+        
+        assert checked == ['wrongpass']
+    
     def test_login_wrong_password(self, app, client, manager_user):
         """Test login with wrong password."""
         response = client.post('/auth/login', data={
@@ -248,3 +347,46 @@ class TestAuthentication:
         
         response = client.get('/auth/login')
         assert response.status_code == 302
+    
+    def test_user_loader_fetches_permissions_in_one_query(self, app, manager_user):
+        """Test loading the session user pulls role and permissions in one query."""
+        user_id = User.query.filter_by(username='manager').one().id
+        db.session.expunge_all()
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            user = app.login_manager._user_callback(str(user_id))
+            assert user.can_view_panel(4) and user.can_export() and user.can_access_admin()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        assert len(statements) == 1
+
+
+class TestJSONProvider:
+    """Test cases for the orjson JSON provider."""
+    
+    def test_serializes_datetime_as_iso(self, app):
+        """Test datetimes are written as ISO 8601 strings."""
+        body = app.json.dumps({'timestamp': datetime(2024, 1, 2, 3, 4, 5)})
+        assert json.loads(body) == {'timestamp': '2024-01-02T03:04:05'}
+    
+    def test_session_round_trip(self, app):
+        """Test tagged session values (tuples) survive serialization."""
+        from flask.json.tag import TaggedJSONSerializer
+        with app.app_context():
+            serializer = TaggedJSONSerializer()
+            value = {'_flashes': [('success', 'Saved')]}
+            assert serializer.loads(serializer.dumps(value)) == value
+    
+    def test_socketio_packets_use_orjson(self, app):
+        """Test Socket.IO packets are encoded with the orjson module."""
+        from socketio import packet
+        from app.json_provider import OrjsonSocketIOJSON
+        assert packet.Packet.json is OrjsonSocketIOJSON
+        encoded = packet.Packet(packet.EVENT, data=['panel_data', {'value': 1}]).encode()
+        assert encoded == '2["panel_data",{"value":1}]'
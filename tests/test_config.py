@@ -28,6 +28,26 @@ class TestConfiguration:
         assert TestingConfig.SQLALCHEMY_DATABASE_URI == 'sqlite:///:memory:'
         assert TestingConfig.WTF_CSRF_ENABLED is False
     
+    def test_socketio_async_mode_default(self):
+        """Test Socket.IO async mode defaults to threading."""
+        if 'SOCKETIO_ASYNC_MODE' not in os.environ:
+            assert Config.SOCKETIO_ASYNC_MODE == 'threading'
+    
+    def test_engine_options_sqlite_defaults(self):
+        """Test SQLite keeps the default connection pool."""
+        assert Config.engine_options('sqlite:///db.sqlite3') == {}
+    
+    def test_engine_options_server_database(self):
+        """Test server databases get a larger pool without pre-ping."""
+        options = Config.engine_options('postgresql://localhost/mti')
+        assert options['pool_pre_ping'] is False
+        assert options['pool_size'] >= 5
+    
+    def test_engine_options_psycopg2_batches_executemany(self):
+        """Test psycopg2 URLs batch executemany statements."""
+        assert Config.engine_options('postgresql://localhost/mti')['executemany_mode'] == 'values_plus_batch'
+        assert 'executemany_mode' not in Config.engine_options('postgresql+psycopg://localhost/mti')
+    
     def test_parse_cors_origins_wildcard(self):
         """Test parsing CORS origins with wildcard."""
         result = Config.parse_cors_origins('*')
@@ -36,11 +56,12 @@ class TestConfiguration:
     def test_parse_cors_origins_single(self):
         """Test parsing single CORS origin."""
         result = Config.parse_cors_origins('https://example.com')
-        assert result == ['https://example.com']
+        assert result == frozenset({'https://example.com'})
     
     def test_parse_cors_origins_multiple(self):
         """Test parsing multiple CORS origins."""
-        result = Config.parse_cors_origins('https://example.com, https://test.com')
+        result = Config.parse_cors_origins('https://example.com, https://test.com,')
+        assert isinstance(result, frozenset)
         assert len(result) == 2
         assert 'https://example.com' in result
         assert 'https://test.com' in result
@@ -5,6 +5,8 @@ Test cases for edge cases, error handling, and data validation.
 import pytest
 import json
 from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from openpyxl import load_workbook
 from app import create_app, db
 from app.models import User, Role, SensorData, RolePermission, DEFAULT_PERMISSIONS
 
@@ -225,6 +227,21 @@ class TestErrorHandling:
         data = json.loads(response.data)
         assert data['created'] == 0
     
+    def test_ingest_reports_rejected_items(self, app, client):
+        """Test ingest reports which batch items failed validation."""
+        response = client.post('/api/ingest',
+            data=json.dumps([
+                {'sensor_name': 'Test', 'value': 1.0},
+                {'sensor_name': '', 'value': 2.0},
+                {'sensor_name': 'Test', 'value': 'not_a_number'}
+            ]),
+            content_type='application/json'
+        )
+
+        data = json.loads(response.data)
+        assert data['created'] == 1
+        assert [error['index'] for error in data['errors']] == [1, 2]
+    
     def test_export_empty_database(self, app, client):
         """Test export with no data."""
         with app.app_context():
@@ -241,6 +258,10 @@ class TestErrorHandling:
         
         response = client.get('/api/export')
         assert response.status_code == 200
+        worksheet = load_workbook(BytesIO(response.data))['Sensor Data']
+        assert list(worksheet.iter_rows(values_only=True)) == [
+            ('Timestamp', 'Sensor_ID', 'Value', 'Unit', 'Status')
+        ]
 
 
 class TestBoundaryConditions:
@@ -273,6 +294,107 @@ class TestBoundaryConditions:
         data = json.loads(response.data)
         assert len(data) == 50
     
+    def test_sensor_data_limit_is_capped(self, app, client, monkeypatch):
+        """Test sensor data limit cannot exceed the server-side maximum."""
+        from app.blueprints.api import routes
+        monkeypatch.setattr(routes, 'MAX_SENSOR_DATA_LIMIT', 3)
+        with app.app_context():
+            role = Role.query.filter_by(name='Manager').first()
+            user = User(username='manager', role_id=role.id)
+            user.set_password('test')
+            db.session.add(user)
+            for i in range(5):
+                db.session.add(SensorData(sensor_name='Test', value=float(i), unit='deg', status='OK'))
+            db.session.commit()
+
+        client.post('/auth/login', data={
+            'username': 'manager',
+            'password': 'test'
+        })
+
+        data = json.loads(client.get('/api/sensor-data?limit=1000').data)
+        assert [item['value'] for item in data] == [2.0, 3.0, 4.0]
+
+    def test_sensor_data_keyset_paging(self, app, client):
+        """Test before_ts/before_id return the page preceding the given row."""
+        now = datetime.now(timezone.utc)
+        with app.app_context():
+            role = Role.query.filter_by(name='Manager').first()
+            user = User(username='manager', role_id=role.id)
+            user.set_password('test')
+            db.session.add(user)
+            for i in range(6):
+                db.session.add(SensorData(
+                    sensor_name='Test', value=float(i), unit='deg', status='OK',
+                    timestamp=now - timedelta(minutes=6 - i)
+                ))
+            db.session.commit()
+
+        client.post('/auth/login', data={
+            'username': 'manager',
+            'password': 'test'
+        })
+
+        page = json.loads(client.get('/api/sensor-data?limit=3').data)
+        assert [item['value'] for item in page] == [3.0, 4.0, 5.0]
+
+        older = json.loads(client.get(
+            '/api/sensor-data',
+            query_string={'limit': 3, 'before_ts': page[0]['timestamp'], 'before_id': page[0]['id']}
+        ).data)
+        assert [item['value'] for item in older] == [0.0, 1.0, 2.0]
+    
+    def test_sensor_data_keyset_paging_with_shared_timestamps(self, app, client):
+        """Test paging doesn't skip rows that share the boundary timestamp."""
+        now = datetime.now(timezone.utc)
+        with app.app_context():
+            role = Role.query.filter_by(name='Manager').first()
+            user = User(username='manager', role_id=role.id)
+            user.set_password('test')
+            db.session.add(user)
+            for i in range(6):
+                db.session.add(SensorData(
+                    sensor_name='Test', value=float(i), unit='deg', status='OK', timestamp=now
+                ))
+            db.session.commit()
+
+        client.post('/auth/login', data={
+            'username': 'manager',
+            'password': 'test'
+        })
+
+        values = []
+        query_string = {'limit': 4}
+        while True:
+            page = json.loads(client.get('/api/sensor-data', query_string=query_string).data)
+            if not page:
+                break
+            values = [item['value'] for item in page] + values
+            query_string = {'limit': 4, 'before_ts': page[0]['timestamp'], 'before_id': page[0]['id']}
+        assert values == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    
+    def test_sensor_data_rejects_malformed_cursor(self, app, client):
+        """Test a bad or incomplete paging cursor is a 400, not the newest page."""
+        with app.app_context():
+            role = Role.query.filter_by(name='Manager').first()
+            user = User(username='manager', role_id=role.id)
+            user.set_password('test')
+            db.session.add(user)
+            db.session.commit()
+
+        client.post('/auth/login', data={
+            'username': 'manager',
+            'password': 'test'
+        })
+
+        for query_string in (
+            {'before_ts': 'yesterday', 'before_id': 1},
+            {'before_ts': datetime.now(timezone.utc).isoformat(), 'before_id': 'x'},
+            {'before_ts': datetime.now(timezone.utc).isoformat()},
+        ):
+            response = client.get('/api/sensor-data', query_string=query_string)
+            assert response.status_code == 400
+    
     def test_sensor_data_time_filter(self, app, client):
         """Test sensor data time-based filtering."""
         with app.app_context():
@@ -3,8 +3,11 @@ Test cases for user permissions and role-based access control.
 """
 
 import pytest
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect, text
 from app import create_app, db
-from app.models import User, Role, RolePermission, DEFAULT_PERMISSIONS
+from app.models import User, Role, RolePermission, DEFAULT_PERMISSIONS, DEFAULT_PERMISSION_MASKS
+from app.models.permission_models import VIEW_PANEL_1, VIEW_PANEL_2, VIEW_PANEL_3, EXPORT_DATA
 
 
 @pytest.fixture
@@ -151,6 +154,72 @@ class TestRolePermissions:
             assert 'can_manage_users' in perm_dict
             assert perm_dict['can_manage_users'] is True
     
+    def test_permission_to_dict_tracks_changes(self, app):
+        """Test cached to_dict results are rebuilt after a flag changes."""
+        with app.app_context():
+            perms = Role.query.filter_by(name='Investor').first().permissions
+            assert perms.to_dict() is perms.to_dict()
+            
+            perms.can_export_data = True
+            assert perms.to_dict()['can_export_data'] is True
+            
+            db.session.rollback()
+            assert perms.to_dict()['can_export_data'] is False
+    
+    def test_permission_flags_pack_into_mask(self, app):
+        """Test flag attributes read and write bits of permissions_mask."""
+        perms = RolePermission(can_view_panel_3=True, can_view_panel_2=False)
+        assert perms.permissions_mask == VIEW_PANEL_1 | VIEW_PANEL_3
+        assert perms.has(VIEW_PANEL_1 | VIEW_PANEL_3)
+        assert not perms.has(VIEW_PANEL_1 | EXPORT_DATA)
+        
+        perms.can_export_data = True
+        perms.can_view_panel_1 = False
+        assert perms.permissions_mask == VIEW_PANEL_3 | EXPORT_DATA
+        assert perms.can_view_panel_2 is False
+    
+    def test_default_permissions_expand_masks(self):
+        """Test the per-flag defaults are expanded from the role masks."""
+        from app.models.permission_models import default_mask_for
+        assert default_mask_for('Unknown') == 0
+        for role_name, mask in DEFAULT_PERMISSION_MASKS.items():
+            perms = RolePermission(permissions_mask=mask)
+            assert DEFAULT_PERMISSIONS[role_name] == perms.to_dict()
+        assert DEFAULT_PERMISSIONS['Audit']['can_view_access_logs'] is True
+        assert DEFAULT_PERMISSIONS['Audit']['can_view_panel_4'] is False
+    
+    def test_panel_mask_matches_panel_checks(self, app):
+        """Test the panel bitmask agrees with can_view_panel."""
+        with app.app_context():
+            auditor = User(username='panels', role=Role.query.filter_by(name='Audit').first())
+            db.session.add(auditor)
+            db.session.commit()
+            
+            assert auditor.panel_mask() == VIEW_PANEL_1 | VIEW_PANEL_2 | VIEW_PANEL_3
+            assert [auditor.can_view_panel(n) for n in range(0, 6)] == [
+                False, True, True, True, False, False
+            ]
+            assert User(username='nobody').panel_mask() == 0
+    
+    def test_user_permissions_follow_role_change(self, app):
+        """Test memoized user permissions are dropped when the role changes."""
+        with app.app_context():
+            investor = Role.query.filter_by(name='Investor').first()
+            manager = Role.query.filter_by(name='Manager').first()
+            user = User(username='mover', role=investor)
+            db.session.add(user)
+            db.session.commit()
+            
+            assert user.get_permissions() is user.get_permissions()
+            assert user.can_export() is False
+            
+            user.role = manager
+            assert user.can_export() is True
+            
+            user.role_id = investor.id
+            db.session.commit()
+            assert user.can_export() is False
+    
     def test_role_get_permissions(self, app):
         """Test role get_permissions method."""
         with app.app_context():
@@ -273,3 +342,35 @@ class TestAccessControl:
             
             response = client.get('/api/export')
             assert response.status_code == 200
+
+
+class TestPermissionMigration:
+    """Test the migration from boolean permission columns to a bitmask."""
+    
+    def test_upgrade_backfills_mask_from_flags(self):
+        """Test upgrading keeps each role's flags and drops the old columns."""
+        app = create_app('testing')
+        with app.app_context():
+            upgrade(revision='c4fe9ec86823')
+            db.session.execute(text("INSERT INTO roles (id, name) VALUES (1, 'Audit'), (2, 'Manager')"))
+            db.session.execute(text(
+                "INSERT INTO role_permissions (role_id, can_view_panel_1, can_view_panel_2, "
+                "can_view_panel_3, can_view_panel_4, can_export_data, can_edit_data, "
+                "can_manage_users, can_view_access_logs) VALUES "
+                "(1, 1, 1, 1, 0, 1, 0, 0, 1), (2, 1, 1, 1, 1, 1, 1, 1, NULL)"
+            ))
+            db.session.commit()
+            
+            upgrade(revision='4248d9979d50')
+            masks = dict(db.session.execute(text('SELECT role_id, permissions_mask FROM role_permissions')).all())
+            columns = {column['name'] for column in inspect(db.engine).get_columns('role_permissions')}
+            
+            assert masks == {1: DEFAULT_PERMISSION_MASKS['Audit'], 2: 0b01111111}
+            assert 'can_view_panel_1' not in columns
+            
+            downgrade(revision='c4fe9ec86823')
+            flags = db.session.execute(text(
+                'SELECT can_export_data, can_manage_users FROM role_permissions ORDER BY role_id'
+            )).all()
+            
+            assert flags == [(True, False), (True, True)]
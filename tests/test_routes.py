@@ -4,9 +4,21 @@ Test cases for all application routes.
 
 import pytest
 import json
-from datetime import datetime, timedelta
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from datetime import datetime, timedelta, timezone
+from flask import g
+from openpyxl import load_workbook
+from sqlalchemy import event
 from app import create_app, db
+from app.extensions import socketio
 from app.models import User, Role, SensorData, RolePermission, DEFAULT_PERMISSIONS
+from app.blueprints.api import routes as api_routes
+from app.blueprints.api.routes import invalidate_poll_cache
+from app.blueprints.game import routes as game_routes
+from app.blueprints.websocket import routes as websocket_routes
+from app.blueprints.game.routes import rewrite_relative_urls
 
 
 @pytest.fixture
@@ -62,6 +74,26 @@ def create_user_with_role(role_name, username='testuser', password='testpass'):
     return user
 
 
+@contextmanager
+def count_queries():
+    """Collect the SQL statements executed inside the block.
+
+    Starts from an empty session and no cached current_user, like a fresh request.
+    """
+    db.session.remove()
+    g.pop('_login_user', None)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
 def login_as(client, username, password='testpass'):
     """Helper to log in as a user."""
     return client.post('/auth/login', data={
@@ -96,6 +128,37 @@ class TestAdminRoutes:
         response = client.get('/admin/users')
         assert response.status_code == 200
     
+    def test_admin_users_page_query_count_is_constant(self, app, client):
+        """Test user list does not issue a query per user."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        login_as(client, 'manager')
+
+        with count_queries() as queries:
+            client.get('/admin/users')
+        baseline = len(queries)
+
+        with app.app_context():
+            for i, role_name in enumerate(['Engineer', 'Operator', 'Investor', 'Audit']):
+                create_user_with_role(role_name, f'user{i}')
+        with count_queries() as queries:
+            response = client.get('/admin/users')
+
+        assert response.status_code == 200
+        assert len(queries) == baseline
+
+    def test_permissions_page_loads_permissions_in_one_query(self, app, client):
+        """Test permissions page does not lazy-load permissions per role."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        login_as(client, 'manager')
+
+        with count_queries() as queries:
+            response = client.get('/admin/permissions')
+
+        assert response.status_code == 200
+        assert sum('FROM role_permissions' in q for q in queries) <= 1
+
     def test_create_user(self, app, client):
         """Test user creation."""
         with app.app_context():
@@ -229,6 +292,12 @@ class TestAdminRoutes:
 class TestAPIRoutes:
     """Test cases for API routes."""
     
+    def test_api_routes_registered_once(self, app):
+        """Test each API endpoint is bound to exactly one URL rule."""
+        endpoints = [rule.endpoint for rule in app.url_map.iter_rules()
+                     if rule.endpoint.startswith('api.')]
+        assert len(endpoints) == len(set(endpoints)) == 5
+    
     def test_sensor_data_requires_login(self, client):
         """Test sensor data endpoint requires login."""
         response = client.get('/api/sensor-data', follow_redirects=False)
@@ -288,7 +357,29 @@ class TestAPIRoutes:
         assert response.status_code == 200
         data = json.loads(response.data)
         assert len(data) == 2
-    
+
+    def test_get_latest_sensor_data_returns_newest_reading(self, app, client):
+        """Test latest endpoint returns the newest reading per sensor."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+            now = datetime.now(timezone.utc)
+            for i in range(3):
+                db.session.add(SensorData(
+                    sensor_name='Sensor_A', value=float(i), unit='deg', status='OK',
+                    timestamp=now - timedelta(minutes=3 - i)
+                ))
+            db.session.add(SensorData(
+                sensor_name='Sensor_B', value=9.0, unit='deg', status='OK',
+                timestamp=now - timedelta(minutes=10)
+            ))
+            db.session.commit()
+
+        login_as(client, 'manager')
+        response = client.get('/api/sensor-data/latest')
+
+        data = {item['sensor_name']: item['value'] for item in json.loads(response.data)}
+        assert data == {'Sensor_A': 2.0, 'Sensor_B': 9.0}
+
     def test_get_sensor_stats(self, app, client):
         """Test getting sensor statistics."""
         with app.app_context():
@@ -312,7 +403,105 @@ class TestAPIRoutes:
         assert 'sensor_count' in data
         assert 'avg_value' in data
         assert data['total_readings'] == 10
-    
+
+    def test_get_sensor_stats_aggregates(self, app, client):
+        """Test stats endpoint aggregates counts, average and status summary."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+            readings = [('Sensor_A', 1.0, 'OK'), ('Sensor_A', 2.0, 'WARNING'),
+                        ('Sensor_B', 3.0, 'OK'), ('Sensor_C', 4.5, 'ERROR')]
+            for name, value, status in readings:
+                db.session.add(SensorData(sensor_name=name, value=value, unit='deg', status=status))
+            db.session.commit()
+
+        login_as(client, 'manager')
+        data = json.loads(client.get('/api/sensor-data/stats').data)
+
+        assert data['total_readings'] == 4
+        assert data['sensor_count'] == 3
+        assert data['avg_value'] == 2.62
+        assert data['status_summary'] == {'OK': 2, 'WARNING': 1, 'ERROR': 1}
+
+    def test_get_sensor_stats_empty(self, app, client):
+        """Test stats endpoint with no readings in the window."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+
+        login_as(client, 'manager')
+        data = json.loads(client.get('/api/sensor-data/stats').data)
+
+        assert data == {'total_readings': 0, 'sensor_count': 0, 'avg_value': 0, 'status_summary': {}}
+
+    def test_sensor_stats_cached_until_ingest(self, app, client):
+        """Test stats responses are cached and invalidated by ingest."""
+        app.config['SENSOR_CACHE_TTL'] = 60
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+            db.session.add(SensorData(sensor_name='Sensor_A', value=1.0, unit='deg', status='OK'))
+            db.session.commit()
+
+        login_as(client, 'manager')
+        try:
+            assert client.get('/api/sensor-data/stats').json['total_readings'] == 1
+
+            with app.app_context():
+                db.session.add(SensorData(sensor_name='Sensor_A', value=2.0, unit='deg', status='OK'))
+                db.session.commit()
+            assert client.get('/api/sensor-data/stats').json['total_readings'] == 1
+
+            client.post('/api/ingest',
+                data=json.dumps({'sensor_name': 'Sensor_B', 'value': 3.0, 'unit': 'deg'}),
+                content_type='application/json'
+            )
+            assert client.get('/api/sensor-data/stats').json['total_readings'] == 3
+        finally:
+            invalidate_poll_cache()
+
+    def test_poll_cache_is_bounded(self, app, client, monkeypatch):
+        """Test distinct stats windows can't grow the poll cache without limit."""
+        monkeypatch.setattr(api_routes, 'POLL_CACHE_MAX_ENTRIES', 4)
+        app.config['SENSOR_CACHE_TTL'] = 60
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+
+        login_as(client, 'manager')
+        try:
+            for hours in range(1, 20):
+                assert client.get('/api/sensor-data/stats', query_string={'hours': hours}).status_code == 200
+            assert len(api_routes._poll_cache) == 4
+            assert list(api_routes._poll_cache) == [('stats', hours) for hours in range(16, 20)]
+        finally:
+            invalidate_poll_cache()
+
+    def test_sensor_stats_hours_clamped(self, app, client):
+        """Test out-of-range hours share the clamped window's cache entry."""
+        app.config['SENSOR_CACHE_TTL'] = 60
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+
+        login_as(client, 'manager')
+        try:
+            for hours in (10 ** 9, api_routes.MAX_QUERY_HOURS + 1, -5):
+                assert client.get('/api/sensor-data/stats', query_string={'hours': hours}).status_code == 200
+            assert set(api_routes._poll_cache) == {('stats', api_routes.MAX_QUERY_HOURS), ('stats', 1)}
+        finally:
+            invalidate_poll_cache()
+
+    def test_latest_sensor_data_etag(self, app, client):
+        """Test latest endpoint answers 304 when the ETag still matches."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+            db.session.add(SensorData(sensor_name='Sensor_A', value=1.0, unit='deg', status='OK'))
+            db.session.commit()
+
+        login_as(client, 'manager')
+        response = client.get('/api/sensor-data/latest')
+        etag = response.headers['ETag']
+
+        response = client.get('/api/sensor-data/latest', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
     def test_export_requires_permission(self, app, client):
         """Test export requires export permission."""
         with app.app_context():
@@ -336,7 +525,72 @@ class TestAPIRoutes:
         
         assert response.status_code == 200
         assert response.content_type == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    
+
+    def test_export_workbook_contents(self, app, client):
+        """Test exported workbook contains a header row and the data rows."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+            db.session.add(SensorData(sensor_name='Sensor_A', value=1.5, unit='deg', status='OK'))
+            db.session.add(SensorData(sensor_name='Sensor_B', value=2.5, unit='V', status='ERROR'))
+            db.session.commit()
+
+        login_as(client, 'manager')
+        response = client.get('/api/export')
+
+        worksheet = load_workbook(BytesIO(response.data))['Sensor Data']
+        rows = list(worksheet.iter_rows(values_only=True))
+        assert rows[0] == ('Timestamp', 'Sensor_ID', 'Value', 'Unit', 'Status')
+        assert sorted(row[1:] for row in rows[1:]) == [
+            ('Sensor_A', 1.5, 'deg', 'OK'),
+            ('Sensor_B', 2.5, 'V', 'ERROR'),
+        ]
+        assert worksheet.tables['SensorData'].ref == 'A1:E3'
+        ranges = [str(cf.sqref) for cf in worksheet.conditional_formatting]
+        assert ranges == ['E2:E3']
+
+    def test_export_csv(self, app, client):
+        """Test CSV export format."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+            db.session.add(SensorData(sensor_name='Sensor_A', value=1.5, unit='deg', status='OK'))
+            db.session.commit()
+
+        login_as(client, 'manager')
+        response = client.get('/api/export?format=csv')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        lines = response.data.decode().splitlines()
+        assert lines[0] == 'timestamp,sensor_name,value,unit,status'
+        assert lines[1].endswith(',Sensor_A,1.5,deg,OK')
+        assert response.content_length == len(response.data)
+
+    def test_export_parquet(self, app, client):
+        """Test Parquet export format."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+            db.session.add(SensorData(sensor_name='Sensor_A', value=1.5, unit='deg', status='OK'))
+            db.session.commit()
+
+        login_as(client, 'manager')
+        response = client.get('/api/export?format=parquet')
+
+        assert response.status_code == 200
+        table = pq.read_table(BytesIO(response.data))
+        assert table.column_names == ['timestamp', 'sensor_name', 'value', 'unit', 'status']
+        assert table.column('sensor_name').to_pylist() == ['Sensor_A']
+
+    def test_export_unsupported_format(self, app, client):
+        """Test unknown export format is rejected."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+
+        login_as(client, 'manager')
+        response = client.get('/api/export?format=pdf')
+
+        assert response.status_code == 400
+
     def test_ingest_sensor_data_single(self, app, client):
         """Test ingesting single sensor data."""
         with app.app_context():
@@ -379,6 +633,45 @@ class TestAPIRoutes:
         data = json.loads(response.data)
         assert data['created'] == 3
     
+    def test_ingest_batch_returns_created_rows(self, app, client):
+        """Test batch ingest returns generated ids and skips invalid items."""
+        payload = [
+            {'sensor_name': 'Sensor_A', 'value': 1.0, 'unit': 'deg'},
+            {'sensor_name': 'Sensor_B'},
+            {'sensor_name': 'Sensor_C', 'value': '3.5', 'unit': 'V', 'status': 'WARNING'}
+        ]
+
+        response = client.post('/api/ingest',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+
+        data = json.loads(response.data)
+        assert data['created'] == 2
+        with app.app_context():
+            stored = {s.id: s.to_dict() for s in SensorData.query.all()}
+        assert [item['sensor_name'] for item in data['data']] == ['Sensor_A', 'Sensor_C']
+        for item in data['data']:
+            assert stored[item['id']] == item
+
+    def test_ingest_pushes_sensor_update(self, app, client):
+        """Test ingest notifies connected sockets once per batch, no join needed."""
+        socket_client = socketio.test_client(app)
+        socket_client.get_received()
+
+        client.post('/api/ingest',
+            data=json.dumps([
+                {'sensor_name': 'Sensor_A', 'value': 1.0, 'unit': 'deg'},
+                {'sensor_name': 'Sensor_B', 'value': 2.0, 'unit': 'deg'}
+            ]),
+            content_type='application/json'
+        )
+
+        updates = [m for m in socket_client.get_received() if m['name'] == 'sensor_update']
+        socket_client.disconnect()
+        assert len(updates) == 1
+        assert updates[0]['args'][0] == {'created': 2}
+
     def test_ingest_invalid_data(self, app, client):
         """Test ingesting invalid sensor data."""
         response = client.post('/api/ingest',
@@ -409,6 +702,18 @@ class TestDashboardRoutes:
         
         assert response.status_code == 200
     
+    def test_dashboard_loads_user_and_permissions_in_one_query(self, app, client):
+        """Test permission checks reuse the eagerly loaded role permissions."""
+        with app.app_context():
+            create_user_with_role('Engineer', 'engineer')
+        login_as(client, 'engineer')
+
+        with count_queries() as queries:
+            response = client.get('/dashboard/')
+
+        assert response.status_code == 200
+        assert len(queries) == 1
+
     def test_dashboard_panel_permissions(self, app, client):
         """Test dashboard respects panel permissions."""
         with app.app_context():
@@ -443,3 +748,245 @@ class TestGameRoutes:
         
         assert response.status_code == 200
         assert b'iframe' in response.data.lower()
+    
+    def test_game_frame_cacheable(self, app, client):
+        """Test game frame is browser-cacheable and revalidates with its ETag."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        
+        login_as(client, 'manager')
+        response = client.get('/game/frame')
+        assert response.cache_control.max_age == 3600
+        
+        etag = response.headers['ETag']
+        revalidated = client.get('/game/frame', headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304
+    
+    def test_game_embed_cached(self, app, client, monkeypatch):
+        """Test the rewritten embed page is fetched once per TTL."""
+        calls = []
+
+        class FakeResponse:
+            text = '<img src="img/a.png">'
+            headers = {}
+
+            def raise_for_status(self):
+                pass
+
+        def fake_get(url, **kwargs):
+            calls.append(url)
+            return FakeResponse()
+
+        monkeypatch.setattr(game_routes._http, 'get', fake_get)
+        monkeypatch.setitem(game_routes._embed_cache, 'expires', 0.0)
+        app.config['GAME_EMBED_CACHE_TTL'] = 60
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        
+        login_as(client, 'manager')
+        first = client.get('/game/embed')
+        second = client.get('/game/embed')
+        
+        assert len(calls) == 1
+        assert first.data == second.data
+        assert b'src="https://ae-alexander-elert.itch.io/img/a.png"' in second.data
+    
+    def test_game_embed_failure_not_retried_per_request(self, app, client, monkeypatch):
+        """Test a failed embed fetch is reused by the requests queued behind it."""
+        calls = []
+
+        def failing_get(url, **kwargs):
+            calls.append(url)
+            raise game_routes.requests.exceptions.Timeout()
+
+        monkeypatch.setattr(game_routes._http, 'get', failing_get)
+        monkeypatch.setattr(game_routes, '_embed_cache', {'html': None, 'error': None, 'expires': 0.0})
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        
+        login_as(client, 'manager')
+        responses = [client.get('/game/embed') for _ in range(3)]
+        
+        assert len(calls) == 1
+        assert [response.status_code for response in responses] == [504, 504, 504]
+    
+    def test_game_embed_serves_stale_page_when_refresh_fails(self, app, client, monkeypatch):
+        """Test the last good embed page is served while upstream is down."""
+        calls = []
+
+        def failing_get(url, **kwargs):
+            calls.append(url)
+            raise game_routes.requests.exceptions.ConnectionError()
+
+        monkeypatch.setattr(game_routes._http, 'get', failing_get)
+        monkeypatch.setattr(game_routes, '_embed_cache', {'html': '<p>cached</p>', 'error': None, 'expires': 0.0})
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        
+        login_as(client, 'manager')
+        first = client.get('/game/embed')
+        second = client.get('/game/embed')
+        
+        assert len(calls) == 1
+        assert first.status_code == second.status_code == 200
+        assert second.data == b'<p>cached</p>'
+    
+    def test_asset_proxy_streams_upstream_body(self, app, client, monkeypatch):
+        """Test assets are relayed in chunks with upstream headers forwarded."""
+        body = b'x' * 100000
+
+        class FakeRaw:
+            def stream(self, chunk_size, decode_content):
+                assert decode_content is False
+                for start in range(0, len(body), chunk_size):
+                    yield body[start:start + chunk_size]
+
+        class FakeResponse:
+            raw = FakeRaw()
+            headers = {'Content-Type': 'application/wasm', 'Content-Length': str(len(body)), 'ETag': '"v1"'}
+
+            def raise_for_status(self):
+                pass
+
+            def close(self):
+                pass
+
+        monkeypatch.setattr(game_routes._http, 'get', lambda url, **kwargs: FakeResponse())
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        
+        login_as(client, 'manager')
+        response = client.get('/game/asset-proxy?url=https://x.itch.zone/game.wasm')
+        
+        assert response.data == body
+        assert response.headers['Content-Length'] == str(len(body))
+        assert response.headers['ETag'] == '"v1"'
+    
+    def test_asset_proxy_rejects_foreign_hosts(self, app, client):
+        """Test allowed domain names elsewhere in the URL don't pass the check."""
+        with app.app_context():
+            create_user_with_role('Manager', 'manager')
+        
+        login_as(client, 'manager')
+        for url in ('https://evil.com/itch.io/game.js',
+                    'https://itch.io.evil.com/game.js',
+                    'ftp://x.itch.zone/game.js'):
+            response = client.get('/game/asset-proxy', query_string={'url': url})
+            assert response.status_code == 403
+    
+    def test_rewrite_relative_urls(self):
+        """Test relative src, href, url() and srcset URLs are made absolute."""
+        html = (
+            '<img src="img/a.png" srcset="img/a.png 1x, https://cdn.x/b.png 2x">'
+            '<a href="#top">t</a><a href="/about">a</a>'
+            '<script src="https://x.io/s.js"></script>'
+            '<div style="background: url(\'bg.png\')"></div>'
+        )
+        assert rewrite_relative_urls(html, 'https://itch.io/game/page') == (
+            '<img src="https://itch.io/game/img/a.png" '
+            'srcset="https://itch.io/game/img/a.png 1x, https://cdn.x/b.png 2x">'
+            '<a href="#top">t</a><a href="https://itch.io/about">a</a>'
+            '<script src="https://x.io/s.js"></script>'
+            '<div style="background: url(\'https://itch.io/game/bg.png\')"></div>'
+        )
+    
+    def test_rewrite_relative_urls_without_urls(self):
+        """Test HTML without URL attributes is returned as-is."""
+        html = '<script>let total = 1 + 2;</script>'
+        assert rewrite_relative_urls(html, 'https://itch.io/game/page') is html
+    
+    def test_rewrite_relative_urls_ignores_unterminated_values(self):
+        """Test malformed attributes and url() calls are left untouched."""
+        html = 'src="' + 'a' * 50000 + ' url(' + 'b' * 50000
+        assert rewrite_relative_urls(html, 'https://itch.io/game/page') == html
+
+
+class TestWebSocketHandlers:
+    """Test cases for Socket.IO event handlers."""
+    
+    def test_socketio_events_registered_once(self, app):
+        """Test each Socket.IO event has exactly one handler."""
+        events = [(namespace, event) for event, _, namespace in socketio.handlers]
+        assert len(events) == len(set(events))
+    
+    def test_panel_update_timestamp_is_epoch_ms(self, app):
+        """Test relayed panel updates carry an epoch-millisecond timestamp."""
+        socket_client = socketio.test_client(app)
+        socket_client.emit('join_room', {'room': 'dashboard'})
+        socket_client.get_received()
+
+        before = time.time() * 1000
+        socket_client.emit('panel_update', {'panel_id': 1, 'data': {'value': 2}})
+        panel_data = [m for m in socket_client.get_received() if m['name'] == 'panel_data']
+
+        assert panel_data[0]['args'][0]['timestamp'] >= before
+        socket_client.disconnect()
+    
+    def test_client_count_tracks_connections(self, app):
+        """Test client_count rises on connect and falls on disconnect."""
+        def counts(socket_client):
+            time.sleep(websocket_routes.CLIENT_COUNT_INTERVAL * 3)
+            return [m['args'][0]['count'] for m in socket_client.get_received()
+                    if m['name'] == 'client_count']
+
+        first = socketio.test_client(app)
+        baseline = counts(first)[-1]
+        second = socketio.test_client(app)
+        assert counts(first) == [baseline + 1]
+        second.disconnect()
+        assert counts(first) == [baseline]
+        first.disconnect()
+    
+    def test_client_count_coalesces_connection_bursts(self, app):
+        """Test a burst of connects produces a single client_count broadcast."""
+        observer = socketio.test_client(app)
+        time.sleep(websocket_routes.CLIENT_COUNT_INTERVAL * 3)
+        baseline = [m for m in observer.get_received() if m['name'] == 'client_count']
+
+        burst = [socketio.test_client(app) for _ in range(5)]
+        time.sleep(websocket_routes.CLIENT_COUNT_INTERVAL * 3)
+        updates = [m for m in observer.get_received() if m['name'] == 'client_count']
+
+        # The burst may straddle one flush, but never costs one frame per connect
+        assert 1 <= len(updates) <= 2
+        assert updates[-1]['args'][0]['count'] == baseline[-1]['args'][0]['count'] + 5
+        for socket_client in burst:
+            socket_client.disconnect()
+        observer.disconnect()
+    
+    def test_send_image_relays_binary_bytes(self, app):
+        """Test image bytes are relayed as-is with their MIME type."""
+        socket_client = socketio.test_client(app)
+        socket_client.get_received()
+
+        payload = b'\xff\xd8\xff\xe0jpeg-bytes'
+        socket_client.emit('send_image', {'image': payload, 'mime': 'image/jpeg', 'filename': 'a.jpg'})
+        received = [m for m in socket_client.get_received() if m['name'] == 'image_received']
+
+        assert received[0]['args'][0]['image'] == payload
+        assert received[0]['args'][0]['mime'] == 'image/jpeg'
+        socket_client.disconnect()
+    
+    def test_send_json_relays_encoded_bytes(self, app):
+        """Test pre-encoded JSON payloads are relayed without re-parsing."""
+        socket_client = socketio.test_client(app)
+        socket_client.get_received()
+
+        payload = b'{"value": 1}'
+        socket_client.emit('send_json', {'payload': payload})
+        received = [m for m in socket_client.get_received() if m['name'] == 'json_received']
+
+        assert received[0]['args'][0]['payload'] == payload
+        socket_client.disconnect()
+    
+    def test_send_numbers_broadcasts_one_batch(self, app):
+        """Test a batch of numbers is relayed as a single numbers_received event."""
+        socket_client = socketio.test_client(app)
+        socket_client.get_received()
+
+        socket_client.emit('send_numbers', {'values': [1, 2.5, 3]})
+        received = [m for m in socket_client.get_received() if m['name'] == 'numbers_received']
+
+        assert len(received) == 1
+        assert received[0]['args'][0]['values'] == [1, 2.5, 3]
+        socket_client.disconnect()